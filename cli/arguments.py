@@ -170,6 +170,14 @@ def parse_args() -> argparse.Namespace:
         help='Maximum number of examples to include in runtime-fix prompts'
     )
     
+    # Test execution arguments
+    parser.add_argument(
+        '--parallel-tests',
+        type=int,
+        default=1,
+        help='Number of parallel workers, each in its own copy of the repository: test methods run side by side during isolated execution (also the test JVMs the batched isolated run forks at once), and group iterations run side by side during group execution (at most 5, one per iteration); 0 uses one worker per available CPU. Capped at the number of available CPUs'
+    )
+
     # Output retention arguments
     parser.add_argument(
         '--retain-test-suites',
@@ -50,7 +50,7 @@ from init.build import _ensure_sdkman_installed, _install_jdk_with_sdkman
 
 # New imports for test execution
 from utils.build_system_detector import detect_build_system
-from utils.test_executor import run_test_class, run_all_tests
+from utils.test_executor import run_test_class, run_all_tests, prewarm_build_daemon
 from utils.test_result_parser import extract_test_method_names
 from utils.compile_fix_loop import count_errors
 
@@ -628,6 +628,9 @@ def main():
             
         print_success("Build file updated with required dependencies")
         
+        # Boot the build daemon in the background while the tests are being generated
+        prewarm_build_daemon(repo_path, "gradle" if gradle_build else "maven")
+        
         # Log JUnit version from global config (now guaranteed to be set)
         json_logger.update_field("junit_version", test_config.get_junit_version())
         
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The modules import each other as top-level packages (utils, config, ...), as when
+# generate_test_suite.py is run from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
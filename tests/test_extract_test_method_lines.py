@@ -0,0 +1,76 @@
+import pytest
+
+from utils import test_executor
+from utils.test_executor import extract_test_method_lines
+
+TEST_CLASS = """package com.example;
+
+import org.junit.jupiter.api.Test;
+
+public class FooTest {
+
+    @Test
+    public void singleLine() { assertEquals(Foo.class, foo.getClass()); }
+    @Test
+    public void multiLine() {
+        String text = "{ not a block";
+        if (text.isEmpty()) {
+            fail();
+        }
+    }
+
+
+    @Test
+    public void last() {
+        char brace = '}';
+    }
+}
+"""
+
+
+@pytest.fixture(params=["tree-sitter", "text"])
+def extraction_path(request, monkeypatch):
+    if request.param == "text":
+        monkeypatch.setattr(test_executor, "_JAVA_LANGUAGE", None)
+    elif test_executor._JAVA_LANGUAGE is None:
+        pytest.skip("tree-sitter is not installed")
+    test_executor._parsed_test_methods.cache_clear()
+    yield request.param
+    test_executor._parsed_test_methods.cache_clear()
+
+
+def test_single_line_method_ends_on_its_own_line(extraction_path):
+    assert extract_test_method_lines(TEST_CLASS, "singleLine") == [
+        "    @Test",
+        "    public void singleLine() { assertEquals(Foo.class, foo.getClass()); }",
+    ]
+
+
+def test_multi_line_method_ends_at_its_closing_brace(extraction_path):
+    assert extract_test_method_lines(TEST_CLASS, "multiLine") == [
+        "    @Test",
+        "    public void multiLine() {",
+        '        String text = "{ not a block";',
+        "        if (text.isEmpty()) {",
+        "            fail();",
+        "        }",
+        "    }",
+    ]
+
+
+def test_last_method_leaves_out_the_class_closing_brace(extraction_path):
+    assert extract_test_method_lines(TEST_CLASS, "last") == [
+        "    @Test",
+        "    public void last() {",
+        "        char brace = '}';",
+        "    }",
+    ]
+
+
+def test_unknown_method_gives_no_lines(extraction_path):
+    assert extract_test_method_lines(TEST_CLASS, "missing") == []
+
+
+def test_method_snippet_with_class_literal_is_returned_whole():
+    snippet = "// Reads the type\n@Test\npublic void readsType() {\n    assertEquals(Foo.class, type);\n}"
+    assert extract_test_method_lines(snippet, "readsType") == snippet.split("\n")
@@ -0,0 +1,60 @@
+import subprocess
+
+import pytest
+
+from utils import test_executor
+from utils.test_executor import _OFFLINE_RESOLUTION_FAILURE_RE, run_group_iteration
+
+
+@pytest.mark.parametrize("output", [
+    "[ERROR] Failed to execute goal on project demo: Could not resolve dependencies for project com.example:demo:jar:1.0",
+    "[ERROR] Plugin org.apache.maven.plugins:maven-surefire-plugin:3.2.5 or one of its dependencies could not be resolved",
+    "[ERROR] Cannot access central (https://repo.maven.apache.org/maven2) in offline mode and the artifact "
+    "junit:junit:jar:4.13.2 has not been downloaded from it before.",
+])
+def test_maven_offline_resolution_failures_match(output):
+    assert _OFFLINE_RESOLUTION_FAILURE_RE.search(output)
+
+
+@pytest.mark.parametrize("output", [
+    "> Could not resolve all files for configuration ':testRuntimeClasspath'.",
+    "   > No cached version of org.junit.jupiter:junit-jupiter:5.10.0 available for offline mode.",
+])
+def test_gradle_offline_resolution_failures_match(output):
+    assert _OFFLINE_RESOLUTION_FAILURE_RE.search(output)
+
+
+def test_test_failures_do_not_match():
+    output = "FooTest > readsValue() FAILED\n    org.opentest4j.AssertionFailedError: expected: <1> but was: <2>"
+    assert not _OFFLINE_RESOLUTION_FAILURE_RE.search(output)
+
+
+def _run_offline_then_online(monkeypatch, tmp_path, offline_run_time):
+    clock = [0.0]
+    calls = []
+
+    def fake_run_streaming(cmd, cwd, env, timeout, stop_pattern=None):
+        calls.append((cmd, timeout))
+        if "-o" in cmd:
+            clock[0] += offline_run_time
+            return 1, "[ERROR] Could not resolve dependencies for project com.example:demo:jar:1.0"
+        return 0, ""
+
+    monkeypatch.setattr(test_executor.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(test_executor, "_run_streaming", fake_run_streaming)
+    cmd = ["mvn", "test", "-Dtest=FooTest", "-o"]
+    run_group_iteration("com.example.FooTest", cmd, tmp_path, "maven", ["readsValue"], 100, {})
+    return calls
+
+
+def test_online_retry_gets_the_remaining_time(monkeypatch, tmp_path):
+    calls = _run_offline_then_online(monkeypatch, tmp_path, offline_run_time=30.0)
+    assert calls == [
+        (["mvn", "test", "-Dtest=FooTest", "-o"], 100),
+        (["mvn", "test", "-Dtest=FooTest"], 70.0),
+    ]
+
+
+def test_online_retry_times_out_when_no_time_is_left(monkeypatch, tmp_path):
+    with pytest.raises(subprocess.TimeoutExpired):
+        _run_offline_then_online(monkeypatch, tmp_path, offline_run_time=100.0)
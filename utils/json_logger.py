@@ -91,6 +91,7 @@ class TestGenerationLogger:
                     "assertion_errors": None,
                     "runtime_errors": None,
                     "timeout_errors": None,
+                    "iterations_run": None,
                     "failures": {}
                 },
                 "summary": {
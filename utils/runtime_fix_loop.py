@@ -300,8 +300,7 @@ def runtime_fix_loop(
         
         finally:
             # Clean up the test file after test attempt
-            if test_file.exists():
-                test_file.unlink()
+            test_file.unlink(missing_ok=True)
     
     # If we get here, we've exhausted all attempts
     print(f"   {error('Runtime fix failed after')} {attempts_made} attempts")
@@ -2,13 +2,576 @@ import subprocess
 import os
 import time
 import re
+import queue
+import shutil
+import tempfile
+import threading
+import collections
+import functools
+import hashlib
+import heapq
+import json
+import concurrent.futures
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple, Optional, List, Dict
+from typing import Tuple, Optional, List, Dict, Set
 from .build_system_detector import BuildSystem
-from .test_result_parser import parse_test_output, extract_test_method_names
+from .test_result_parser import parse_test_output, extract_test_method_names, parse_junit_xml_report, parse_junit_xml_testcases, _METHOD_DECL_RE
 from config import test_config
 from utils.colors import Colors, step, success, error, warning, info, summary
 
+# tree-sitter locates test methods in one parse per class; without it, methods are
+# found by scanning the source text
+try:
+    from tree_sitter import Language, Parser
+    import tree_sitter_java
+    _JAVA_LANGUAGE = Language(tree_sitter_java.language())
+except ImportError:
+    _JAVA_LANGUAGE = None
+
+# Extra arguments appended to every Gradle test invocation so the client always
+# attaches to a warm daemon instead of paying project configuration each time
+_GRADLE_DAEMON_ARGS = ["--daemon", "-Dorg.gradle.configureondemand=true"]
+
+# Gradle init script applied with -I to group runs: makes every iteration really run
+# the tests, rather than restoring them from the build cache or skipping them as up to date
+_GRADLE_GROUP_INIT_SCRIPT = """allprojects {
+    tasks.withType(Test) {
+        outputs.cacheIf { false }
+        outputs.upToDateWhen { false }
+    }
+}
+"""
+
+# Gradle init script applied with -I to batched isolated runs: every test class runs
+# in a fresh JVM (forkEvery), several of them at once
+_GRADLE_BATCH_INIT_SCRIPT = """allprojects {
+    tasks.withType(Test) {
+        forkEvery = 1
+        maxParallelForks = %d
+        outputs.cacheIf { false }
+        outputs.upToDateWhen { false }
+    }
+}
+"""
+
+# Lets Gradle reuse task outputs (compiled classes) from its local build cache
+_GRADLE_BUILD_CACHE_ARG = "--build-cache"
+
+# Gradle version in a wrapper's distributionUrl, e.g. ".../gradle-7.6.1-bin.zip"
+_GRADLE_WRAPPER_VERSION_RE = re.compile(r'gradle-(\d+)\.(\d+)')
+
+# Configuration cache flags, understood from Gradle 6.6 on; problems only warn so
+# builds with incompatible plugins still run (just without a cache entry)
+_GRADLE_CONFIGURATION_CACHE_ARGS = ["--configuration-cache", "--configuration-cache-problems=warn"]
+
+# Flags that stop a build from checking remote repositories once the dependencies are resolved
+_OFFLINE_ARGS = {
+    "gradle": "--offline",
+    "maven": "-o",
+}
+
+# Build output of an offline run that needed a dependency missing from the local cache:
+# Maven's "Could not resolve dependencies", "... could not be resolved" and "Cannot access
+# central (...) in offline mode", Gradle's "Could not resolve all files ..." and
+# "No cached version of group:name:version available for offline mode"
+_OFFLINE_RESOLUTION_FAILURE_RE = re.compile(
+    r'could not resolve|could not be resolved|in offline mode|no cached version of \S+ available for offline mode',
+    re.IGNORECASE
+)
+
+# ANSI escape sequences (color codes, cursor movement, etc.)
+_ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+# A class declaration at the start of a line (a class literal like "Foo.class" is not one)
+_JAVA_CLASS_DECLARATION_RE = re.compile(r'^[ \t]*(?:(?:public|protected|private|abstract|final|static)\s+)*class\s+\w', re.MULTILINE)
+
+# String and char literals and line comments, whose braces do not open or close a block
+_JAVA_NON_CODE_RE = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])+\'|//.*')
+
+# Gradle test summary, e.g. "1 test completed, 0 failed"
+_GRADLE_COMPLETION_RE = re.compile(r'(\d+) tests? completed, (\d+) failed')
+
+# Gradle per-test failure line, e.g. "com.example.FooTest > testBar FAILED"
+_GRADLE_FAILED_LINE_RE = re.compile(r' > [^\n]* FAILED')
+
+# Maven test summary, e.g. "Tests run: 1, Failures: 0, Errors: 0"
+_MAVEN_RESULTS_RE = re.compile(r'Tests run: (\d+), Failures: (\d+), Errors: (\d+)')
+
+# Maven "[ERROR]" lines: section headers ("[ERROR] Failures:") and their entries
+# ("[ERROR]   FooTest.testBar:12 expected:<1> but was:<2>")
+_MAVEN_ERROR_LINE_RE = re.compile(r'^[ \t]*\[ERROR\](.*)$', re.MULTILINE)
+
+# Test named by a Maven "Failures:" entry, e.g. "FooTest.testBar:12" or "FooTest.testBar Expected exception:"
+_MAVEN_FAILURE_ENTRY_RE = re.compile(r'(\w+)\.(\w+)(?::\d+|\s+Expected exception:)')
+
+# Test named by a Maven "Errors:" entry, e.g. "FooTest.testBar:12 » NullPointer"
+_MAVEN_ERROR_ENTRY_RE = re.compile(r'(\w+)\.(\w+)(?::\d+|\s*»)')
+
+# Test named by an older surefire "Failed tests:" / "Tests in error:" entry, e.g. "testBar(com.example.FooTest): message"
+_MAVEN_LEGACY_ENTRY_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\):')
+
+# Lines the older surefire lists are parsed from: section headers, entries (which always
+# contain "):") and the lines that end a section; everything else is skipped unseen
+_MAVEN_LEGACY_LINE_RE = re.compile(
+    r'^.*(?:Failed tests:|Tests in error:|\):).*$|^[ \t]*(?:Tests run:|\[INFO\]|\[ERROR\]).*$',
+    re.MULTILINE
+)
+
+# Gradle per-test failure line capturing the class and method, e.g. "FooTest > testBar FAILED",
+# plus (without consuming them) the two lines after it, which hold the exception
+# ("    java.lang.AssertionError at FooTest.java:10") and possibly its cause
+_GRADLE_FAILED_TEST_RE = re.compile(
+    r'^[^\n]*?(\w+) > (\w+) FAILED[^\n]*(?=(?:\n([^\n]*))?(?:\n([^\n]*))?)',
+    re.MULTILINE
+)
+
+# Failure and error counts in a lowercased Maven summary line, e.g. "tests run: 3, failures: 1, errors: 0"
+_MAVEN_FAILURES_COUNT_RE = re.compile(r'failures:\s*(\d+)')
+_MAVEN_ERRORS_COUNT_RE = re.compile(r'errors:\s*(\d+)')
+
+# Lines of Maven output that hold a failures or errors count, in any case (re.ASCII keeps
+# the case folding to what str.lower() does for these ASCII patterns)
+_MAVEN_COUNT_LINE_RE = re.compile(r'^.*(?:failures:|errors:).*$', re.MULTILINE | re.IGNORECASE | re.ASCII)
+
+# Exceptions that make an AssertionError's "Caused by:" line count as a runtime error
+_RUNTIME_CAUSE_EXCEPTIONS = ('NullPointerException', 'IllegalArgumentException', 'RuntimeException', 'ParseException', 'MissingMethodInvocationException')
+
+# Markers for build output that neither build system branch could categorize, each set
+# scanned in a single case-insensitive pass
+_ASSERTION_MARKER_RE = re.compile(r'assertionerror|expected:|but was:', re.IGNORECASE | re.ASCII)
+_RUNTIME_EXCEPTION_MARKER_RE = re.compile('|'.join(map(re.escape, _RUNTIME_CAUSE_EXCEPTIONS)), re.IGNORECASE | re.ASCII)
+
+# Summary lines printed once all failure details have been written out; with
+# early exit enabled the build is killed here, skipping the trailing build noise
+# (bytes patterns: they are matched against the raw output lines, see _run_streaming)
+_EARLY_EXIT_PATTERNS = {
+    "gradle": re.compile(rb'\d+ tests? completed, [1-9]\d* failed'),
+    "maven": re.compile(rb'Tests run: \d+, (?:Failures: [1-9]\d*, Errors: \d+|Failures: \d+, Errors: [1-9]\d*), Skipped: \d+\s*$'),
+}
+
+# Number of trailing output lines kept from a streamed build
+_OUTPUT_SCROLLBACK_LINES = 10000
+
+# Lines scrolling out of the window that still matter for failure categorization are
+# kept separately (up to _OUTPUT_SIGNAL_LINES of them) and put in front of the output
+_OUTPUT_SIGNAL_RE = re.compile(rb'FAILED|Failures:|Errors:|Caused by:|Exception|Error\b')
+_OUTPUT_SIGNAL_LINES = 500
+
+# Seconds _run_streaming waits for buffered output after the build exits, even when its
+# timeout is already (nearly) used up
+_OUTPUT_DRAIN_GRACE = 1.0
+
+# Where each build system writes its JUnit XML reports, relative to the repository root
+_JUNIT_REPORT_DIRS = {
+    "gradle": Path("build") / "test-results" / "test",
+    "maven": Path("target") / "surefire-reports",
+}
+
+# Directory (relative to the repository root) holding the compiled Maven test classes
+_MAVEN_TEST_CLASSES_DIR = Path("target") / "test-classes"
+
+# Directories (relative to the repository root) holding the compiled classes and resources
+# an isolated test run depends on, by build system; the main classes come first
+_CLASS_OUTPUT_DIRS = {
+    "gradle": (
+        Path("build") / "classes" / "java" / "main",
+        Path("build") / "resources" / "main",
+        Path("build") / "classes" / "java" / "test",
+        Path("build") / "resources" / "test",
+    ),
+    "maven": (Path("target") / "classes", Path("target") / "test-classes"),
+}
+
+# Build files (relative to the repository root) that declare the classpath
+_CLASSPATH_FILES = (
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "settings.gradle",
+    "settings.gradle.kts",
+    "gradle.properties",
+    str(Path("gradle") / "libs.versions.toml"),
+)
+
+# Suffix of the per-method test classes written for a batched isolated run
+_ISOLATED_BATCH_SUFFIX = "_Isolated"
+
+# Group iterations always run at least this many times; after that the loop stops as soon
+# as two consecutive iterations give the same outcome for every test
+_MIN_GROUP_ITERATIONS = 3
+
+# Directory (inside the repository) holding the per-worker copies used for parallel test runs
+_WORK_DIR_NAME = ".llm4testgen_work"
+
+# Environment variable splitting each group iteration into method shards (see group_shard_count)
+_PARALLEL_SHARDS_ENV = "LLM4TG_PARALLEL_SHARDS"
+
+# Run time of each test method ("package.Class#method") over earlier sharded runs, used
+# to balance the shards; kept as a moving average that mostly reflects the last ~10 runs
+_TEST_DURATIONS_FILE = Path.home() / ".cache" / "llm4testgen" / "test_durations.json"
+_TEST_DURATION_WEIGHT = 2 / 11
+# Assumed run time in seconds of a test method that has not been timed yet
+_DEFAULT_TEST_DURATION = 1.0
+_test_durations_lock = threading.Lock()
+
+# Environment variable enabling the isolated result cache: an isolated test whose file
+# content, compiled classes and classpath are unchanged since its last run is not run again
+_ISOLATED_RESULT_CACHE_ENV = "LLM4TG_CACHE_ISOLATED_RESULTS"
+# One cache file per repository, named after a hash of its path
+_ISOLATED_RESULT_CACHE_DIR = Path.home() / ".cache" / "llm4testgen" / "isolated_results"
+# Cached results older than this (in seconds) are dropped when the cache is saved
+_ISOLATED_RESULT_MAX_AGE = 7 * 24 * 3600
+
+# Repositories whose Gradle daemon has already been warmed up in this process
+_gradle_warmed: Set[Path] = set()
+
+# Background daemon warmups started by prewarm_build_daemon, by repository
+_daemon_warmups: Dict[Path, subprocess.Popen] = {}
+
+@functools.lru_cache(maxsize=32)
+def _resolve_gradle_command(work_dir: Path) -> Tuple[str, ...]:
+    """Resolve (once per directory) how to invoke Gradle, making the wrapper executable if needed."""
+    gradle_wrapper = work_dir / "gradlew"
+    if not gradle_wrapper.exists():
+        return ("gradle",)
+    if not os.access(gradle_wrapper, os.X_OK):
+        gradle_wrapper.chmod(0o755)
+    return (str(gradle_wrapper),)
+
+def gradle_command_prefix(work_dir: Path) -> List[str]:
+    """
+    Command prefix that invokes Gradle for a repository: its wrapper if it has one, else "gradle".
+    
+    Args:
+        work_dir: Repository root (or worker copy)
+        
+    Returns:
+        New list holding the executable, ready to be extended with tasks and flags
+    """
+    return list(_resolve_gradle_command(work_dir))
+
+def warm_gradle_daemon(gradle_cmd: List[str], repo_path: Path, env: Dict[str, str], timeout: int = 120) -> None:
+    """
+    Start (or attach to) a Gradle daemon for the repository once per process.
+    
+    The warmup is skipped when a daemon registry already exists under the
+    Gradle user home, since a daemon is then most likely already running.
+    
+    Args:
+        gradle_cmd: Gradle executable prefix (wrapper path or "gradle")
+        repo_path: Path to the repository root
+        env: Environment used for the Gradle invocations
+        timeout: Timeout in seconds for the warmup call
+    """
+    if repo_path in _gradle_warmed:
+        return
+    _gradle_warmed.add(repo_path)
+    
+    if await_daemon_warmup(repo_path, timeout):
+        return
+    
+    gradle_user_home = Path(env.get('GRADLE_USER_HOME', Path.home() / ".gradle"))
+    if any((gradle_user_home / "daemon").glob("*/registry.bin")):
+        return
+    
+    try:
+        subprocess.run(
+            gradle_cmd + ["help", "-q"] + _GRADLE_DAEMON_ARGS,
+            cwd=repo_path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout,
+            env=env,
+            close_fds=False
+        )
+    except Exception as e:
+        print(f"   {warning('Gradle daemon warmup failed:')} {e}")
+
+def await_daemon_warmup(repo_path: Path, timeout: int = 120) -> bool:
+    """
+    Wait for a background warmup started by prewarm_build_daemon to finish, if one is pending.
+    
+    A build started while the daemon (Gradle's or mvnd) is still booting would spawn a
+    second daemon, so every build entry point calls this first. The warmup is reaped
+    here and only waited for once.
+    
+    Args:
+        repo_path: Path to the repository root
+        timeout: Timeout in seconds to wait for the warmup
+        
+    Returns:
+        True if a background warmup was pending, False otherwise
+    """
+    background_warmup = _daemon_warmups.pop(repo_path, None)
+    if background_warmup is None:
+        return False
+    try:
+        background_warmup.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        pass
+    return True
+
+def prewarm_build_daemon(repo_path: Path, build_system: BuildSystem) -> None:
+    """
+    Start the build daemon for a repository in the background, without waiting for it.
+    
+    Meant to be called right after setup, so the daemon boots while the tests are
+    being generated. Gradle always runs with a daemon; Maven only when mvnd is
+    installed, otherwise this does nothing. Daemons are left running afterwards, as
+    other llm4testgen runs on the machine may share them.
+    
+    Args:
+        repo_path: Path to the repository root
+        build_system: Build system type
+    """
+    if repo_path in _daemon_warmups or repo_path in _gradle_warmed:
+        return
+    
+    if build_system == "gradle":
+        cmd = gradle_command_prefix(repo_path) + ["help", "-q"] + _GRADLE_DAEMON_ARGS
+    elif build_system == "maven" and maven_executable() == "mvnd":
+        cmd = ["mvnd", "validate", "-q"]
+    else:
+        return
+    
+    try:
+        _daemon_warmups[repo_path] = subprocess.Popen(
+            cmd,
+            cwd=repo_path,
+            env=_test_env(build_system, test_config.get_java_path()),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except Exception as e:
+        print(f"   {warning('Build daemon warmup failed:')} {e}")
+
+@functools.lru_cache(maxsize=4)
+def _test_env(build_system: str, java_path: Optional[str]) -> Dict[str, str]:
+    """
+    Build the environment for test runs, cached per build system and Java path.
+    
+    The returned dict is shared between callers and must be treated as read-only.
+    Switching the Java path in test_config yields a new cache entry.
+    
+    Args:
+        build_system: Build system type
+        java_path: Java installation path from test_config (may be None)
+        
+    Returns:
+        Environment dict for subprocess calls
+    """
+    env = os.environ.copy()
+    if java_path:
+        env['JAVA_HOME'] = java_path
+        env['PATH'] = f"{java_path}/bin:{env['PATH']}"
+        if build_system == "gradle":
+            # -Xshare:auto lets the Gradle client JVM use class data sharing for faster startup
+            env['GRADLE_OPTS'] = f"-Dorg.gradle.java.home={java_path} -Xshare:auto"
+    return env
+
+@functools.lru_cache(maxsize=1)
+def maven_executable() -> str:
+    """Return "mvnd" when the Maven daemon is on PATH, so builds skip Maven startup; "mvn" otherwise."""
+    return "mvnd" if shutil.which("mvnd") else "mvn"
+
+@functools.lru_cache(maxsize=32)
+def gradle_configuration_cache_args(work_dir: Path) -> List[str]:
+    """
+    Configuration cache flags for the Gradle wrapper in work_dir, if its version supports them.
+    
+    Args:
+        work_dir: Repository root (or worker copy) containing the wrapper
+        
+    Returns:
+        Flags to append to the Gradle command (empty without a wrapper, or for Gradle < 6.6
+        or an unknown version); the list is shared between callers and must be treated as read-only
+    """
+    if not (work_dir / "gradlew").exists():
+        # A system-wide Gradle has no known version
+        return []
+    try:
+        wrapper_properties = (work_dir / "gradle" / "wrapper" / "gradle-wrapper.properties").read_text()
+    except OSError:
+        return []
+    match = _GRADLE_WRAPPER_VERSION_RE.search(wrapper_properties)
+    if match and (int(match.group(1)), int(match.group(2))) >= (6, 6):
+        return _GRADLE_CONFIGURATION_CACHE_ARGS
+    return []
+
+def _report_mtime(report_file: Path) -> Optional[int]:
+    """Return the modification time of a report in nanoseconds, or None if it does not exist."""
+    try:
+        return report_file.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def junit_report_file(work_dir: Path, build_system: BuildSystem, test_class: str) -> Path:
+    """Path of the JUnit XML report the build writes for a test class."""
+    return work_dir / _JUNIT_REPORT_DIRS[build_system] / f"TEST-{test_class}.xml"
+
+def read_junit_report(report_file: Path, previous_mtime: Optional[int]) -> Optional[Dict[str, str]]:
+    """
+    Read a JUnit XML report, if the last run (re)wrote it.
+    
+    Args:
+        report_file: Path of the report (see junit_report_file)
+        previous_mtime: Report modification time recorded before the run
+        
+    Returns:
+        Dictionary mapping test method names to their status (see parse_junit_xml_report),
+        or None if no fresh, non-empty report is available
+    """
+    mtime = _report_mtime(report_file)
+    if mtime is None or mtime == previous_mtime:
+        # No report, or a stale one left over from an earlier run
+        return None
+    return parse_junit_xml_report(report_file) or None
+
+def read_junit_testcases(
+    report_file: Path,
+    previous_mtime: Optional[int],
+    durations: Optional[Dict[str, float]] = None
+) -> Optional[Dict[str, Tuple[str, str, str]]]:
+    """
+    Read a JUnit XML report with failure details, if the last run (re)wrote it.
+    
+    Args:
+        report_file: Path of the report (see junit_report_file)
+        previous_mtime: Report modification time recorded before the run
+        durations: If given, filled with the run time of every test method of a fresh report
+        
+    Returns:
+        Dictionary mapping test method names to (status, exception_type, details)
+        (see parse_junit_xml_testcases), or None if no fresh, non-empty report is available
+    """
+    mtime = _report_mtime(report_file)
+    if mtime is None or mtime == previous_mtime:
+        # No report, or a stale one left over from an earlier run
+        return None
+    return parse_junit_xml_testcases(report_file, durations) or None
+
+def _run_streaming(
+    cmd: List[str],
+    cwd: Path,
+    env: Dict[str, str],
+    timeout: int,
+    stop_pattern: Optional[re.Pattern] = None
+) -> Tuple[int, str]:
+    """
+    Run a build command and read its merged stdout/stderr line by line.
+    
+    Only the last _OUTPUT_SCROLLBACK_LINES lines are kept, preceded by any failure
+    lines (see _OUTPUT_SIGNAL_RE) that scrolled out before them. If stop_pattern is
+    given, the process is killed as soon as a line matches it.
+    
+    Lines are read as raw bytes; only the kept output is decoded (as UTF-8, with
+    newlines normalized as in text mode), once, when the run ends.
+    
+    Args:
+        cmd: Command to run
+        cwd: Working directory
+        env: Environment for the process
+        timeout: Timeout in seconds
+        stop_pattern: Optional compiled bytes pattern that ends the run early
+        
+    Returns:
+        Tuple of (returncode: int, output: str)
+        
+    Raises:
+        subprocess.TimeoutExpired: If the command exceeds the timeout
+    """
+    # close_fds=False: descriptors opened by Python are non-inheritable (PEP 446), so
+    # there is nothing to close in the child and the per-fork fd sweep can be skipped.
+    # Without preexec_fn, user/group changes or a new session, CPython starts the child
+    # with vfork() on Linux, so neither env nor cwd costs a copy of this process's page
+    # tables; posix_spawn would additionally require cwd=None, which the builds need
+    process = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        close_fds=False
+    )
+    
+    scrollback = collections.deque(maxlen=_OUTPUT_SCROLLBACK_LINES)
+    signal_lines = collections.deque(maxlen=_OUTPUT_SIGNAL_LINES)
+    stopped_early = threading.Event()
+    # Set (under output_lock) once the output has been collected; later lines are discarded
+    output_collected = threading.Event()
+    output_lock = threading.Lock()
+    
+    def _read_output():
+        try:
+            for line in process.stdout:
+                with output_lock:
+                    if output_collected.is_set():
+                        # Keep draining, so a process still writing to the pipe does not block
+                        continue
+                    if len(scrollback) == _OUTPUT_SCROLLBACK_LINES and _OUTPUT_SIGNAL_RE.search(scrollback[0]):
+                        # The oldest line is about to be dropped; keep it if it carries failure details
+                        signal_lines.append(scrollback[0])
+                    scrollback.append(line)
+                if stop_pattern is not None and stop_pattern.search(line):
+                    stopped_early.set()
+                    process.kill()
+                    break
+        finally:
+            # Closed here rather than by the caller: closing a pipe another thread is
+            # blocked reading from waits for that read to return
+            process.stdout.close()
+    
+    # Read on a separate thread so the timeout holds even if a child process
+    # (e.g. a forked test JVM) keeps the pipe open
+    reader = threading.Thread(target=_read_output, daemon=True)
+    reader.start()
+    
+    deadline = time.monotonic() + timeout
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    
+    if not stopped_early.is_set():
+        # Drain whatever is still buffered in the pipe. EOF only comes once every process
+        # holding the pipe has exited, which a server or JVM started by a test may outlive,
+        # so stop waiting at the deadline and keep what has been read by then
+        reader.join(timeout=max(deadline - time.monotonic(), _OUTPUT_DRAIN_GRACE))
+    
+    with output_lock:
+        output_collected.set()
+        output = b"".join(signal_lines) + b"".join(scrollback)
+    return returncode, output.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+@functools.lru_cache(maxsize=32)
+def _class_declaration_pattern(class_name: str) -> re.Pattern:
+    """
+    Compiled pattern matching the declaration of a test class, with or without a "Test" suffix.
+    
+    Args:
+        class_name: Name of the test class
+        
+    Returns:
+        Compiled regex for "public class {class_name}" / "public class {class_name}Test"
+    """
+    return re.compile(rf'public\s+class\s+{re.escape(class_name)}(Test)?\b')
+
+@functools.lru_cache(maxsize=256)
+def _test_method_signature_pattern(method_name: str) -> re.Pattern:
+    """
+    Compiled pattern matching the signature of a test method on a single line.
+    
+    Args:
+        method_name: Name of the test method
+        
+    Returns:
+        Compiled regex for "public void {method_name}(" that does not span line breaks
+    """
+    return re.compile(rf'public[^\S\n]+void[^\S\n]+{re.escape(method_name)}[^\S\n]*\(')
+
 def save_assertion_failure_file(
     isolated_test_content: str,
     method_name: str, 
@@ -41,16 +604,14 @@ def save_assertion_failure_file(
         new_class_name = f"{method_name}_{class_name}_{counter:02d}Test"
         
         # Update the class name inside the file content
-        updated_content = isolated_test_content.replace(
-            f"public class {class_name}Test",
-            f"public class {new_class_name}"
-        ).replace(
-            f"public class {class_name}",
-            f"public class {new_class_name}"
+        updated_content = _class_declaration_pattern(class_name).sub(
+            f"public class {new_class_name}",
+            isolated_test_content,
+            count=1
         )
         
         # Save the file
-        file_path.write_text(updated_content, encoding='utf-8')
+        file_path.write_bytes(updated_content.encode('utf-8'))
         
         print(f"   Saved assertion failure: {filename}")
         
@@ -89,16 +650,14 @@ def save_bug_revealing_runtime_error_file(
         new_class_name = f"{method_name}_{class_name}_{counter:02d}Test"
         
         # Update the class name inside the file content
-        updated_content = isolated_test_content.replace(
-            f"public class {class_name}Test",
-            f"public class {new_class_name}"
-        ).replace(
-            f"public class {class_name}",
-            f"public class {new_class_name}"
+        updated_content = _class_declaration_pattern(class_name).sub(
+            f"public class {new_class_name}",
+            isolated_test_content,
+            count=1
         )
         
         # Save the file
-        file_path.write_text(updated_content, encoding='utf-8')
+        file_path.write_bytes(updated_content.encode('utf-8'))
         
         print(f"   Saved bug-revealing runtime error: {filename}")
         
@@ -109,16 +668,21 @@ def remove_ansi_colors(text: str) -> str:
     """
     Remove ANSI color codes from text to facilitate regex matching.
     """
+    # Builds writing to a pipe normally emit no escape codes at all, so skip the
+    # substitution (and its copy of the text) unless there is an ESC character
+    if '\x1b' not in text:
+        return text
+    
     # Remove ANSI escape sequences (color codes, cursor movement, etc.)
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return ansi_escape.sub('', text)
+    return _ANSI_ESCAPE_RE.sub('', text)
 
 def run_individual_test(
     test_class: str, 
     test_method: str, 
     repo_path: Path, 
     build_system: BuildSystem,
-    timeout: int = 30
+    timeout: int = 30,
+    early_exit_on_failure: bool = False
 ) -> Tuple[bool, str]:
     """
     Run a single test method and return its execution result.
@@ -129,57 +693,50 @@ def run_individual_test(
         repo_path: Path to the repository root
         build_system: "gradle" or "maven"
         timeout: Timeout in seconds for test execution
+        early_exit_on_failure: Stop the build once the failing test summary has been printed
         
     Returns:
         Tuple of (success: bool, output: str)
     """
     try:
         if build_system == "gradle":
-            # Check for Gradle wrapper
-            gradle_wrapper = repo_path / "gradlew"
-            if gradle_wrapper.exists():
-                # Make gradlew executable
-                gradle_wrapper.chmod(0o755)
-                cmd = [str(gradle_wrapper), "test", f"--tests={test_class}", "--stacktrace"]
-            else:
-                cmd = ["gradle", "test", f"--tests={test_class}", "--stacktrace"]
+            cmd = gradle_command_prefix(repo_path) + ["test", f"--tests={test_class}", "--stacktrace"] + _GRADLE_DAEMON_ARGS
                 
         elif build_system == "maven":
+            await_daemon_warmup(repo_path)
             # Extract class name from fully qualified name for Maven
             class_name = test_class.split('.')[-1]
-            cmd = ["mvn", "test", f"-Dtest={class_name}", "-e", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
+            cmd = [maven_executable(), "test", f"-Dtest={class_name}", "-e", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
         else:
             raise ValueError(f"Unsupported build system: {build_system}")
         
-        # Set environment variables for Java
-        env = os.environ.copy()
-        # Get Java version and path from global config (like compile_java_file.py does)
-        java_version = test_config.get_java_version()
+        # Set environment variables for Java (built once per Java path and reused)
         java_path = test_config.get_java_path()
-        
-        if java_path:
-            env['JAVA_HOME'] = java_path
-            env['PATH'] = f"{java_path}/bin:{env['PATH']}"
-            if build_system == "gradle":
-                env['GRADLE_OPTS'] = f"-Dorg.gradle.java.home={java_path}"
-        else:
+        env = _test_env(build_system, java_path)
+        if not java_path:
             print("WARNING: Java path not set in test_config")
         
-        # Run the test
-        result = subprocess.run(
+        # Remember the current report so a stale one is not mistaken for this run's
+        report_file = junit_report_file(repo_path, build_system, test_class)
+        previous_report_mtime = _report_mtime(report_file)
+        
+        # Run the test, streaming its output
+        returncode, output = _run_streaming(
             cmd,
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            env=env
+            repo_path,
+            env,
+            timeout,
+            _EARLY_EXIT_PATTERNS[build_system] if early_exit_on_failure else None
         )
         
-        # Combine stdout and stderr
-        output = result.stdout + "\n" + result.stderr
+        # Prefer the JUnit XML report written by this run
+        report = read_junit_report(report_file, previous_report_mtime)
+        if report is not None:
+            success = not any(status in ("failure", "error") for status in report.values())
+            return success, output
         
-        # Determine success based on exit code and output
-        success = result.returncode == 0
+        # No report: determine success based on exit code and output
+        success = returncode == 0
         
         # Parse the output to get more accurate test results based on build system
         if build_system == "gradle":
@@ -188,8 +745,8 @@ def run_individual_test(
                 # If build is successful and no FAILED pattern found, assume test passed
                 success = True
             else:
-                # Gradle pattern: "1 test completed, 0 failed"
-                test_completion_pattern = re.search(r'(\d+) tests? completed, (\d+) failed', output)
+                # Gradle pattern: "1 test completed, 0 failed" (only searched if the summary is present at all)
+                test_completion_pattern = _GRADLE_COMPLETION_RE.search(output) if ' completed, ' in output else None
                 if test_completion_pattern:
                     total_tests = int(test_completion_pattern.group(1))
                     failed_tests = int(test_completion_pattern.group(2))
@@ -202,14 +759,14 @@ def run_individual_test(
                 else:
                     # Fallback: look for test failure patterns in the output
                     # Check for Gradle test failure patterns like "ClassName > methodName FAILED"
-                    if ' > ' in output and ' FAILED' in output:
+                    if _GRADLE_FAILED_LINE_RE.search(output) is not None:
                         success = False
                     else:
                         # Fallback to build success/failure
-                        success = result.returncode == 0
+                        success = returncode == 0
         elif build_system == "maven":
-            # Maven pattern: "Tests run: 1, Failures: 0, Errors: 0"
-            test_completion_pattern = re.search(r'Tests run: (\d+), Failures: (\d+), Errors: (\d+)', output)
+            # Maven pattern: "Tests run: 1, Failures: 0, Errors: 0" (only searched if the summary is present at all)
+            test_completion_pattern = _MAVEN_RESULTS_RE.search(output) if 'Tests run: ' in output else None
             if test_completion_pattern:
                 total_tests = int(test_completion_pattern.group(1))
                 failed_tests = int(test_completion_pattern.group(2))
@@ -222,7 +779,7 @@ def run_individual_test(
                     success = True
             else:
                 # Fallback to build success/failure
-                success = result.returncode == 0
+                success = returncode == 0
         
         return success, output
         
@@ -231,6 +788,981 @@ def run_individual_test(
     except Exception as e:
         return False, f"Test execution failed: {str(e)}"
 
+def isolated_test_command(
+    test_class: str,
+    work_dir: Path,
+    build_system: BuildSystem
+) -> List[str]:
+    """
+    Build the command that runs an isolated test class; it is the same for every test method.
+    
+    Maven runs always fork the test JVM, like batch and group runs do, so the pom's
+    argLine (agents, JVM flags) applies and a test calling System.exit cannot end the
+    build: running the test inside the Maven JVM would make isolated verdicts differ
+    from group ones.
+    
+    Args:
+        test_class: Fully qualified test class name
+        work_dir: Repository root (or worker copy) the command will run in
+        build_system: Build system type
+        
+    Returns:
+        Command list for subprocess
+    """
+    if build_system == "gradle":
+        return gradle_command_prefix(work_dir) + ["test", f"--tests={test_class}", "--stacktrace"] + _GRADLE_DAEMON_ARGS
+    elif build_system == "maven":
+        return ["mvn", "test", f"-Dtest={test_class.rpartition('.')[2]}", "-e", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true", "-DforkCount=1", "-DreuseForks=true"]
+    else:
+        raise ValueError(f"Unsupported build system: {build_system}")
+
+def isolated_batch_command(
+    test_class: str,
+    work_dir: Path,
+    build_system: BuildSystem,
+    parallel_forks: int
+) -> List[str]:
+    """
+    Build the command that runs all classes of a batched isolated run (see run_isolated_batch).
+    
+    Every test class gets a fresh JVM, so the per-method classes cannot share state.
+    
+    Args:
+        test_class: Fully qualified test class name
+        work_dir: Repository root the command will run in
+        build_system: Build system type
+        parallel_forks: Test JVMs the build may fork at once
+        
+    Returns:
+        Command list for subprocess
+    """
+    if build_system == "gradle":
+        cmd = gradle_command_prefix(work_dir) + ["test", f"--tests={test_class}{_ISOLATED_BATCH_SUFFIX}*"] + _GRADLE_DAEMON_ARGS
+        return cmd + ["-I", str(_gradle_init_script("batch", parallel_forks))]
+    elif build_system == "maven":
+        cmd = [maven_executable(), "test", f"-Dtest={test_class.rpartition('.')[2]}{_ISOLATED_BATCH_SUFFIX}*", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
+        cmd += [f"-DforkCount={parallel_forks}", "-DreuseForks=false"]
+        if maven_build_cache_configured(work_dir):
+            cmd.append("-Dmaven.build.cache.enabled=false")
+        return cmd
+    else:
+        raise ValueError(f"Unsupported build system: {build_system}")
+
+def run_isolated_batch(
+    test_class: str,
+    isolated_tests: Dict[int, Tuple[str, bytes]],
+    test_dir: Path,
+    repo_path: Path,
+    build_system: BuildSystem,
+    timeout: int,
+    env: Dict[str, str],
+    parallel_forks: int
+) -> Set[int]:
+    """
+    Run all isolated tests in a single build and return the ones that passed.
+    
+    Each isolated test file is written as its own class (the test class name plus
+    _ISOLATED_BATCH_SUFFIX and the test index), and the build runs every class in a
+    fresh JVM, parallel_forks at a time. Only passes are taken from the batch: a test
+    that failed, has no report or ran for longer than the isolated timeout still gets
+    its own isolated run, which also provides the output the failure analysis works on.
+    If the batch build times out, the tests that already wrote a passing report still
+    count. The batch classes are removed again afterwards.
+    
+    Args:
+        test_class: Fully qualified test class name
+        isolated_tests: (method name, isolated test file content) by test index
+        test_dir: Directory holding the test class source file
+        repo_path: Path to the repository root
+        build_system: Build system type
+        timeout: Timeout in seconds for a single isolated test run
+        env: Environment for the build process
+        parallel_forks: Test JVMs the build may fork at once
+        
+    Returns:
+        Indices of the tests that passed in the batch
+    """
+    package, _, class_name = test_class.rpartition('.')
+    class_name_re = re.compile(rb'\b' + re.escape(class_name.encode('utf-8')) + rb'\b')
+    
+    batch_files = {}
+    report_files = {}
+    passed_tests = set()
+    try:
+        # Written inside the try, and registered before writing, so the cleanup below also
+        # removes the files already written when a later write fails
+        for test_index, (method_name, isolated_test_bytes) in isolated_tests.items():
+            batch_class = f"{class_name}{_ISOLATED_BATCH_SUFFIX}{test_index}"
+            batch_files[test_index] = test_dir / f"{batch_class}.java"
+            report_files[test_index] = junit_report_file(repo_path, build_system, f"{package}.{batch_class}" if package else batch_class)
+            batch_files[test_index].write_bytes(class_name_re.sub(batch_class.encode('utf-8'), isolated_test_bytes))
+        
+        # Remember the current reports so stale ones are not mistaken for this run's
+        previous_report_mtimes = {test_index: _report_mtime(report_file) for test_index, report_file in report_files.items()}
+        
+        # parallel_forks classes run side by side, so every round of them gets one isolated
+        # timeout, plus one more for compiling and starting the build
+        rounds = -(-len(isolated_tests) // parallel_forks)
+        try:
+            _run_streaming(isolated_batch_command(test_class, repo_path, build_system, parallel_forks), repo_path, env, timeout * (rounds + 1))
+        except subprocess.TimeoutExpired:
+            # Keep the passes of the classes that finished; only the rest run on their own
+            print(f"   {warning('Batched isolated run timed out, running the unfinished tests on their own')}")
+        
+        for test_index, report_file in report_files.items():
+            method_name = isolated_tests[test_index][0]
+            durations = {}
+            testcases = read_junit_testcases(report_file, previous_report_mtimes[test_index], durations)
+            if testcases and testcases.get(method_name, ("",))[0] == "passed" and durations.get(method_name, 0.0) < timeout:
+                passed_tests.add(test_index)
+    except Exception as e:
+        print(f"   {warning('Batched isolated run failed, running every test on its own:')} {e}")
+    finally:
+        for test_index, batch_file in batch_files.items():
+            batch_file.unlink(missing_ok=True)
+            report_files[test_index].unlink(missing_ok=True)
+        if build_system == "maven":
+            # Gradle deletes the classes of removed sources itself; Maven leaves them behind
+            compiled_dir = repo_path / _MAVEN_TEST_CLASSES_DIR / package.replace('.', os.sep)
+            for compiled_class in compiled_dir.glob(f"{class_name}{_ISOLATED_BATCH_SUFFIX}*.class"):
+                compiled_class.unlink(missing_ok=True)
+    
+    return passed_tests
+
+def run_isolated_test(
+    test_class: str,
+    isolated_test_file: Path,
+    isolated_test_bytes: bytes,
+    work_dir: Path,
+    cmd: List[str],
+    build_system: BuildSystem,
+    timeout: int,
+    env: Dict[str, str],
+    early_exit_on_failure: bool = False
+) -> Tuple[bool, str, Optional[str]]:
+    """
+    Write an isolated test file, run it, and remove the file again.
+    
+    Args:
+        test_class: Fully qualified test class name
+        isolated_test_file: Path where the isolated test file is written
+        isolated_test_bytes: UTF-8 encoded content of the isolated test file
+        work_dir: Repository root (or worker copy) to run the build in
+        cmd: Test command for work_dir (see isolated_test_command)
+        build_system: Build system type
+        timeout: Timeout in seconds for test execution
+        env: Environment for the build process
+        early_exit_on_failure: Stop the build once the failing test summary has been printed
+        
+    Returns:
+        Tuple of (test_success: bool, test_output: str, failure_category: Optional[str]);
+        the output is empty for passing runs, and failure_category is taken from the
+        JUnit XML report of a failing run (None without a report, see categorize_test_failure)
+        
+    Raises:
+        subprocess.TimeoutExpired: If the test run exceeds the timeout
+    """
+    isolated_test_file.write_bytes(isolated_test_bytes)
+    
+    try:
+        # Remember the current report so a stale one is not mistaken for this run's
+        report_file = junit_report_file(work_dir, build_system, test_class)
+        previous_report_mtime = _report_mtime(report_file)
+        
+        returncode, test_output = _run_streaming(
+            cmd,
+            work_dir,
+            env,
+            timeout,
+            _EARLY_EXIT_PATTERNS[build_system] if early_exit_on_failure else None
+        )
+        
+        # Prefer the JUnit XML report written by this run; it also tells how a failing
+        # test failed, so its output does not have to be scanned for that
+        testcases = read_junit_testcases(report_file, previous_report_mtime)
+        if testcases is not None:
+            for status, exception_type, details in testcases.values():
+                if status in ("failure", "error"):
+                    return False, test_output, categorize_junit_failure(build_system, status, exception_type, details)
+            return True, "", None
+        
+        # No report: determine success based on exit code and output
+        test_success = returncode == 0
+        
+        # Parse the output to get more accurate test results
+        # Look for patterns like "1 test completed, 0 failed" or "1 test completed, 1 failed"
+        # (only searched if the summary is present at all)
+        test_completion_pattern = _GRADLE_COMPLETION_RE.search(test_output) if ' completed, ' in test_output else None
+        if test_completion_pattern:
+            total_tests = int(test_completion_pattern.group(1))
+            failed_tests = int(test_completion_pattern.group(2))
+            passed_tests = total_tests - failed_tests
+            
+            # If there are failed tests, the test failed
+            if failed_tests > 0:
+                test_success = False
+            else:
+                test_success = True
+        else:
+            # Fallback: look for test failure patterns in the output
+            # Check for Gradle test failure patterns like "ClassName > methodName FAILED"
+            if _GRADLE_FAILED_LINE_RE.search(test_output) is not None:
+                test_success = False
+            elif 'BUILD SUCCESSFUL' in test_output and 'FAILED' not in test_output:
+                # If build is successful and no FAILED pattern found, assume test passed
+                test_success = True
+            else:
+                # Fallback to build success/failure
+                test_success = returncode == 0
+        
+        # Passing runs never look at the output, so it is only handed back for failures
+        return test_success, test_output if not test_success else "", None
+    
+    finally:
+        # Clean up the isolated test file
+        isolated_test_file.unlink(missing_ok=True)
+
+def run_isolated_test_in_worker_copy(
+    worker_copies: "queue.Queue[Tuple[Path, List[str]]]",
+    relative_test_file: Path,
+    isolated_test_bytes: bytes,
+    test_class: str,
+    build_system: BuildSystem,
+    timeout: int,
+    env: Dict[str, str],
+    early_exit_on_failure: bool = False
+) -> Tuple[bool, str, Optional[str]]:
+    """
+    Run an isolated test inside whichever worker copy of the repository is free.
+    
+    Args:
+        worker_copies: Queue of idle worker copies and their test commands, shared by all workers
+        relative_test_file: Test file path relative to the repository root
+        isolated_test_bytes: UTF-8 encoded content of the isolated test file
+        test_class: Fully qualified test class name
+        build_system: Build system type
+        timeout: Timeout in seconds for test execution
+        env: Environment for the build process
+        early_exit_on_failure: Stop the build once the failing test summary has been printed
+        
+    Returns:
+        Same as run_isolated_test
+    """
+    work_dir, cmd = worker_copies.get()
+    try:
+        return run_isolated_test(
+            test_class,
+            work_dir / relative_test_file,
+            isolated_test_bytes,
+            work_dir,
+            cmd,
+            build_system,
+            timeout,
+            env,
+            early_exit_on_failure
+        )
+    finally:
+        worker_copies.put((work_dir, cmd))
+
+def compiled_classes_fingerprint(repo_path: Path, build_system: BuildSystem, test_class: str) -> Optional[str]:
+    """
+    Fingerprint of everything an isolated run of a test class depends on besides its own file.
+    
+    Hashes the content of the compiled main and test classes and resources, the build
+    files declaring the classpath, and the Java path. The class files of the test class
+    itself (and of its batch classes) are left out, since the isolated runs rewrite them.
+    
+    Args:
+        repo_path: Path to the repository root
+        build_system: Build system type
+        test_class: Fully qualified test class name
+        
+    Returns:
+        Hex digest, or None if no main classes are compiled yet
+    """
+    class_name = test_class.rpartition('.')[2]
+    digest = hashlib.blake2b(digest_size=16)
+    main_class_count = 0
+    for dir_index, output_dir in enumerate(_CLASS_OUTPUT_DIRS.get(build_system, ())):
+        for dir_path, dir_names, file_names in os.walk(repo_path / output_dir):
+            # Walk in a fixed order so equal content always gives the same digest
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                class_stem = file_name.partition('.')[0].partition('$')[0]
+                if class_stem == class_name or class_stem.startswith(class_name + _ISOLATED_BATCH_SUFFIX):
+                    continue
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    with open(file_path, 'rb') as output_file:
+                        content = output_file.read()
+                except OSError:
+                    continue
+                digest.update(os.path.relpath(file_path, repo_path).encode('utf-8') + b'\0')
+                digest.update(content)
+                if dir_index == 0 and file_name.endswith('.class'):
+                    main_class_count += 1
+    if not main_class_count:
+        return None
+    
+    for classpath_file in _CLASSPATH_FILES:
+        try:
+            content = (repo_path / classpath_file).read_bytes()
+        except OSError:
+            continue
+        digest.update(classpath_file.encode('utf-8') + b'\0')
+        digest.update(content)
+    digest.update(str(test_config.get_java_path()).encode('utf-8'))
+    return digest.hexdigest()
+
+def isolated_result_key(isolated_test_bytes: bytes, classes_fingerprint: str) -> str:
+    """Cache key of an isolated test run: a hash of its test file and the compiled classes fingerprint."""
+    digest = hashlib.blake2b(isolated_test_bytes, digest_size=16)
+    digest.update(classes_fingerprint.encode('utf-8'))
+    return digest.hexdigest()
+
+def _isolated_result_cache_file(repo_path: Path) -> Path:
+    """Cache file holding the isolated results of one repository."""
+    repo_digest = hashlib.blake2b(str(repo_path.resolve()).encode('utf-8'), digest_size=16).hexdigest()
+    return _ISOLATED_RESULT_CACHE_DIR / f"{repo_digest}.json"
+
+def load_isolated_results(repo_path: Path) -> Dict[str, dict]:
+    """
+    Isolated runs recorded earlier for a repository, when the isolated result cache is enabled.
+    
+    Args:
+        repo_path: Path to the repository root
+        
+    Returns:
+        Dictionary mapping isolated_result_key values to {"success", "failure_category",
+        "recorded_at"} entries (empty if the cache is disabled or cannot be read)
+    """
+    if not os.environ.get(_ISOLATED_RESULT_CACHE_ENV):
+        return {}
+    try:
+        cached_results = json.loads(_isolated_result_cache_file(repo_path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cached_results, dict):
+        return {}
+    return {key: result for key, result in cached_results.items() if isinstance(result, dict)}
+
+def save_isolated_results(
+    repo_path: Path,
+    cached_results: Dict[str, dict],
+    new_results: Dict[str, Tuple[bool, Optional[str]]]
+) -> None:
+    """
+    Add the results of this run's isolated tests to the repository's cache and save it.
+    
+    Args:
+        repo_path: Path to the repository root
+        cached_results: Cache as returned by load_isolated_results
+        new_results: (test_success, failure_category) by isolated_result_key value
+    """
+    if not os.environ.get(_ISOLATED_RESULT_CACHE_ENV) or not new_results:
+        return
+    now = time.time()
+    cached_results = {
+        key: result for key, result in cached_results.items()
+        if isinstance(result.get('recorded_at'), (int, float)) and now - result['recorded_at'] < _ISOLATED_RESULT_MAX_AGE
+    }
+    for key, (test_success, failure_category) in new_results.items():
+        cached_results[key] = {"success": test_success, "failure_category": failure_category, "recorded_at": now}
+    cache_file = _isolated_result_cache_file(repo_path)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial file
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache_file.parent, suffix='.tmp', delete=False) as temp_file:
+            json.dump(cached_results, temp_file)
+        os.replace(temp_file.name, cache_file)
+    except OSError as e:
+        print(f"   {warning('Could not save the isolated result cache:')} {e}")
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process may run on.
+    
+    Uses the scheduler affinity mask where available, which respects cgroup/taskset
+    limits on CI runners, unlike os.cpu_count().
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def create_worker_copies(repo_path: Path, count: int) -> List[Path]:
+    """
+    Create scratch copies of the repository for parallel test execution.
+    
+    Args:
+        repo_path: Path to the repository root
+        count: Number of copies to create
+        
+    Returns:
+        List of paths to the worker copies
+    """
+    work_root = repo_path / _WORK_DIR_NAME
+    worker_copies = []
+    for worker_id in range(count):
+        worker_copy = work_root / f"w{worker_id}"
+        if worker_copy.exists():
+            shutil.rmtree(worker_copy)
+        shutil.copytree(
+            repo_path,
+            worker_copy,
+            symlinks=True,
+            ignore=shutil.ignore_patterns(_WORK_DIR_NAME, ".git", ".gradle")
+        )
+        worker_copies.append(worker_copy)
+    return worker_copies
+
+def remove_worker_copies(repo_path: Path) -> None:
+    """Remove the scratch copies created by create_worker_copies."""
+    shutil.rmtree(repo_path / _WORK_DIR_NAME, ignore_errors=True)
+
+@functools.lru_cache(maxsize=8)
+def _gradle_init_script(kind: str, parallel_forks: int = 1) -> Path:
+    """Write the init script applied to "group" runs or to "batch" isolated runs forking parallel_forks JVMs."""
+    if kind == "batch":
+        init_script = Path(tempfile.gettempdir()) / f"llm4testgen-batch-{parallel_forks}.gradle"
+        init_script.write_text(_GRADLE_BATCH_INIT_SCRIPT % parallel_forks)
+    else:
+        init_script = Path(tempfile.gettempdir()) / "llm4testgen-group.gradle"
+        init_script.write_text(_GRADLE_GROUP_INIT_SCRIPT)
+    return init_script
+
+@functools.lru_cache(maxsize=32)
+def maven_build_cache_configured(work_dir: Path) -> bool:
+    """Whether the project registers the maven-build-cache-extension in .mvn/extensions.xml."""
+    try:
+        return "maven-build-cache-extension" in (work_dir / ".mvn" / "extensions.xml").read_text()
+    except OSError:
+        return False
+
+def group_test_command(
+    test_class: str,
+    work_dir: Path,
+    build_system: BuildSystem,
+    offline: bool = False,
+    test_methods: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Build the command that runs a whole test class in a group iteration.
+    
+    Args:
+        test_class: Fully qualified test class name
+        work_dir: Repository root (or worker copy) the command will run in
+        build_system: Build system type
+        offline: Skip remote repository checks (dependencies must already be resolved)
+        test_methods: Only run these test methods (a shard of the class); defaults to all of them
+        
+    Returns:
+        Command list for subprocess
+    """
+    if build_system == "gradle":
+        if test_methods:
+            test_filters = [f"--tests={test_class}.{method_name}" for method_name in test_methods]
+        else:
+            test_filters = [f"--tests={test_class}"]
+        cmd = gradle_command_prefix(work_dir) + ["test"] + test_filters + _GRADLE_DAEMON_ARGS + gradle_configuration_cache_args(work_dir)
+        cmd += [_GRADLE_BUILD_CACHE_ARG, "-I", str(_gradle_init_script("group"))]
+        if offline:
+            cmd.append(_OFFLINE_ARGS[build_system])
+        return cmd
+    elif build_system == "maven":
+        test_filter = test_class.rpartition('.')[2]
+        if test_methods:
+            test_filter += "#" + "+".join(test_methods)
+        cmd = [maven_executable(), "test", f"-Dtest={test_filter}", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
+        if maven_build_cache_configured(work_dir):
+            # A build cache hit would skip surefire, so every iteration bypasses the cache
+            cmd.append("-Dmaven.build.cache.enabled=false")
+        if offline:
+            cmd.append(_OFFLINE_ARGS[build_system])
+        return cmd
+    else:
+        raise ValueError(f"Unsupported build system: {build_system}")
+
+def record_group_outcomes(
+    test_methods_for_group: List[str],
+    failing_tests: Dict[str, str],
+    iteration_results: Dict[str, bool],
+    iteration_failures: Dict[str, Optional[str]]
+) -> None:
+    """
+    Record the outcome of every group test method for one iteration.
+    
+    Methods reported in failing_tests failed with the given category; every other
+    method was not reported as failed, so it passed (recorded as None).
+    
+    Args:
+        test_methods_for_group: Test methods taking part in the group run
+        failing_tests: Failing method names mapped to their failure category
+        iteration_results: Per-method pass/fail results, updated in place
+        iteration_failures: Per-method failure categories, updated in place
+    """
+    iteration_results.update((method_name, method_name not in failing_tests) for method_name in test_methods_for_group)
+    iteration_failures.update((method_name, failing_tests.get(method_name)) for method_name in test_methods_for_group)
+
+def run_group_iteration(
+    test_class: str,
+    cmd: List[str],
+    work_dir: Path,
+    build_system: BuildSystem,
+    test_methods_for_group: List[str],
+    timeout: int,
+    env: Dict[str, str],
+    durations: Optional[Dict[str, float]] = None
+) -> Tuple[Dict[str, bool], Dict[str, Optional[str]], Optional[Tuple[int, int, int, bool]]]:
+    """
+    Run the whole test class once and work out which test methods passed.
+    
+    The JUnit XML report written by the run is used when available; the console
+    output is only parsed as a fallback. Only work_dir is touched, so parallel
+    iterations call this from worker threads and parse their own results there,
+    while other iterations are still building.
+    
+    Args:
+        test_class: Fully qualified test class name
+        cmd: Group test command for work_dir (see group_test_command)
+        work_dir: Repository root (or worker copy) to run the build in
+        build_system: Build system type
+        test_methods_for_group: Test methods taking part in the group run
+        timeout: Timeout in seconds for the group run
+        env: Environment for the build process
+        durations: If given, filled with the run time of each test method, taken from the
+            JUnit XML report this run wrote (left empty when there is no fresh report)
+        
+    Returns:
+        Tuple of (iteration_results, iteration_failures, iteration_summary) where
+        iteration_failures maps methods to a failure category (None means passed) and
+        iteration_summary is (total, passed, failed, show_error_breakdown) or None
+        
+    Raises:
+        subprocess.TimeoutExpired: If the group run exceeds the timeout
+    """
+    report_file = junit_report_file(work_dir, build_system, test_class)
+    previous_report_mtime = _report_mtime(report_file)
+    
+    # Stream the merged output; only the bounded scrollback is kept for the console fallback
+    deadline = time.monotonic() + timeout
+    _, group_output = _run_streaming(cmd, work_dir, env, timeout)
+    
+    # An offline run cannot fetch a dependency that is missing locally; retry it online
+    # within what is left of the iteration's timeout
+    offline_arg = _OFFLINE_ARGS.get(build_system)
+    if offline_arg in cmd and _OFFLINE_RESOLUTION_FAILURE_RE.search(group_output):
+        online_cmd = [arg for arg in cmd if arg != offline_arg]
+        remaining_time = deadline - time.monotonic()
+        if remaining_time <= 0:
+            raise subprocess.TimeoutExpired(online_cmd, timeout)
+        _, group_output = _run_streaming(online_cmd, work_dir, env, remaining_time)
+    
+    iteration_failures = {}  # Failure categories seen in this iteration
+    iteration_summary = None
+    
+    # For group runs, we need to infer which tests passed based on the summary and known test methods
+    iteration_results = {}
+    
+    # Prefer the JUnit XML report: it lists every test case with its outcome
+    testcases = read_junit_testcases(report_file, previous_report_mtime, durations)
+    if testcases:
+        failing_tests = {
+            method_name: categorize_junit_failure(build_system, status, exception_type, details)
+            for method_name, (status, exception_type, details) in testcases.items()
+            if status in ("failure", "error")
+        }
+        record_group_outcomes(test_methods_for_group, failing_tests, iteration_results, iteration_failures)
+        
+        # Summary line for this iteration
+        iteration_summary = (len(testcases), len(testcases) - len(failing_tests), len(failing_tests), True)
+        return iteration_results, iteration_failures, iteration_summary
+    
+    # Remove ANSI color codes to facilitate parsing
+    clean_group_output = remove_ansi_colors(group_output)
+    
+    if build_system == "maven":
+        # Maven-specific parsing logic
+        # Look for Maven test summary pattern: "Tests run: X, Failures: Y, Errors: Z"
+        maven_summary_pattern = _MAVEN_RESULTS_RE.search(clean_group_output)
+        
+        # Initialize failing_tests at the beginning of Maven parsing
+        failing_tests = {}  # method_name -> failure_type
+        
+        if maven_summary_pattern:
+            total_tests = int(maven_summary_pattern.group(1))
+            failed_tests_count = int(maven_summary_pattern.group(2))
+            error_tests_count = int(maven_summary_pattern.group(3))
+            passed_tests_count = total_tests - failed_tests_count - error_tests_count
+            
+            # Walk only the "[ERROR]" lines to find the failing tests; the section a line
+            # belongs to is set by the last "[ERROR] Failures:" / "[ERROR] Errors:" header
+            current_section = None
+            for error_line in _MAVEN_ERROR_LINE_RE.finditer(clean_group_output):
+                rest = error_line.group(1)
+                
+                # Check for section headers
+                if rest.startswith(' Failures:'):
+                    current_section = 'failure'
+                elif rest.startswith(' Errors:'):
+                    current_section = 'error'
+                elif 'Failures:' in rest or 'Errors:' in rest:
+                    # Skip summary lines such as "[ERROR] Tests run: 3, Failures: 1, ..."
+                    continue
+                elif not rest.startswith('   '):
+                    # End of section
+                    current_section = None
+                elif current_section == 'failure':
+                    # Format: "[ERROR]   OrderByOperatorTest.testOrderByWithNonTextNodeFields:175 expected:<[Alic]e> but was:<[Charli]e>"
+                    # Or: "[ERROR]   OrderByOperatorTest.testOrderByWithNullInputAndSortFields Expected exception: java.lang.NullPointerException"
+                    match = _MAVEN_FAILURE_ENTRY_RE.search(rest)
+                    if match:
+                        failing_tests[match.group(2)] = "assertion_error"
+                elif current_section == 'error':
+                    # Format: "[ERROR]   OrderByOperatorTest.testMethodName:123 » ExceptionName"
+                    # Or: "[ERROR]   OrderByOperatorTest.testMethodName » Unexpected exception, expected<...> but was<...>"
+                    match = _MAVEN_ERROR_ENTRY_RE.search(rest)
+                    if match:
+                        failing_tests[match.group(2)] = "runtime_error"
+            
+            # Summary line for this iteration
+            iteration_summary = (total_tests, passed_tests_count, failed_tests_count + error_tests_count, True)
+            
+            # Store the actual Maven counts for later use
+            iteration_results['_maven_total'] = total_tests
+            iteration_results['_maven_failures'] = failed_tests_count
+            iteration_results['_maven_errors'] = error_tests_count
+        
+        # Fallback: if we still have no failing tests but Maven reported errors/failures, parse the
+        # "Failed tests:" and "Tests in error:" lists printed by older surefire versions (these also
+        # cover the lists under a "Results :" header)
+        if not failing_tests and maven_summary_pattern and (failed_tests_count > 0 or error_tests_count > 0):
+            current_section = None
+            
+            for legacy_line in _MAVEN_LEGACY_LINE_RE.finditer(clean_group_output):
+                line = legacy_line.group(0).strip()
+                
+                # Check for section headers
+                if 'Failed tests:' in line:
+                    current_section = 'failure'
+                    # Check if there's a test on the same line as the header
+                    match = _MAVEN_LEGACY_ENTRY_RE.search(line.split('Failed tests:')[1])
+                    if match:
+                        failing_tests[match.group(1)] = "assertion_error"
+                    continue
+                elif 'Tests in error:' in line:
+                    current_section = 'error'
+                    continue
+                elif line.startswith('Tests run:') or line.startswith('[INFO]') or line.startswith('[ERROR]'):
+                    # End of test results section
+                    current_section = None
+                    continue
+                
+                # Parse test lines in current section
+                # Format: "testMethodName(className): message" or "  testMethodName(className): message"
+                if current_section:
+                    match = _MAVEN_LEGACY_ENTRY_RE.search(line)
+                    if match:
+                        if current_section == 'failure':
+                            failing_tests[match.group(1)] = "assertion_error"
+                        elif current_section == 'error':
+                            failing_tests[match.group(1)] = "runtime_error"
+        
+        # Use the failing_tests information (from either section format) to set the
+        # outcome of each known test method in one pass
+        if maven_summary_pattern:
+            record_group_outcomes(test_methods_for_group, failing_tests, iteration_results, iteration_failures)
+        
+        # Fallback: if no Maven summary found, use the parsed results as-is
+        if not maven_summary_pattern:
+            group_individual_results = parse_test_output(clean_group_output, build_system)
+            iteration_results = group_individual_results
+            
+            # Handle the case where parse_test_output returns {'all_tests': True/False}
+            if 'all_tests' in group_individual_results:
+                all_tests_passed = group_individual_results['all_tests']
+                # Map the overall result to all individual test methods
+                for method_name in test_methods_for_group:
+                    iteration_results[method_name] = all_tests_passed
+                    if all_tests_passed:
+                        if method_name not in iteration_failures:
+                            iteration_failures[method_name] = None  # None means passed
+                    else:
+                        iteration_failures[method_name] = "assertion_error"
+                
+                if all_tests_passed:
+                    # Print simple summary for fallback case
+                    total_tests = len(test_methods_for_group)
+                    passed_tests_count = total_tests
+                    failed_tests_count = 0
+                    iteration_summary = (total_tests, passed_tests_count, failed_tests_count, False)
+
+            else:
+                # For fallback, we can't determine failure types, so mark all failures as assertion_error
+                for method_name, result in iteration_results.items():
+                    if not result:  # False means failed
+                        iteration_failures[method_name] = "assertion_error"
+                    elif method_name not in iteration_failures:
+                        iteration_failures[method_name] = None  # None means passed
+    
+    
+    elif build_system == "gradle":
+        # Gradle-specific parsing logic for group tests
+        # Look for Gradle test summary pattern: "X tests completed, Y failed"
+        gradle_summary_pattern = _GRADLE_COMPLETION_RE.search(clean_group_output)
+        if gradle_summary_pattern:
+            total_tests = int(gradle_summary_pattern.group(1))
+            failed_tests_count = int(gradle_summary_pattern.group(2))
+            passed_tests_count = total_tests - failed_tests_count
+            
+            # Track failure types for individual tests
+            failing_tests = {}  # method_name -> failure_type
+            
+            # Look for Gradle test failure pattern: "ClassName > methodName FAILED"
+            # Format: "com.fishercoder.solutions._235Test > recursiveCallToLeftSubtree FAILED"
+            for match in _GRADLE_FAILED_TEST_RE.finditer(clean_group_output):
+                # Determine failure type from the exception lines printed after the failure line
+                failing_tests[match.group(2)] = classify_gradle_test_failure(match.group(3), match.group(4))
+            
+            # For each known test method, determine if it passed or failed in this iteration
+            record_group_outcomes(test_methods_for_group, failing_tests, iteration_results, iteration_failures)
+            
+            # Store the actual Gradle counts for later use
+            iteration_results['_gradle_total'] = total_tests
+            iteration_results['_gradle_failures'] = failed_tests_count
+            iteration_results['_gradle_passed'] = passed_tests_count
+            
+            # Summary line for this iteration
+            iteration_summary = (total_tests, passed_tests_count, failed_tests_count, True)
+        else:
+            # Gradle pattern not found - assume all tests passed
+            total_tests = len(test_methods_for_group)
+            passed_tests_count = total_tests
+            failed_tests_count = 0
+            iteration_summary = (total_tests, passed_tests_count, failed_tests_count, False)
+    
+    return iteration_results, iteration_failures, iteration_summary
+
+def run_group_iteration_in_worker_copy(
+    test_class: str,
+    worker_copies: "queue.Queue[Tuple[Path, List[str]]]",
+    build_system: BuildSystem,
+    test_methods_for_group: List[str],
+    timeout: int,
+    env: Dict[str, str]
+) -> Tuple[Dict[str, bool], Dict[str, Optional[str]], Optional[Tuple[int, int, int, bool]]]:
+    """
+    Run a group iteration inside whichever worker copy of the repository is free.
+    
+    Args:
+        test_class: Fully qualified test class name
+        worker_copies: Queue of idle worker copies and their group commands, shared by all workers
+        build_system: Build system type
+        test_methods_for_group: Test methods taking part in the group run
+        timeout: Timeout in seconds for the group run
+        env: Environment for the build process
+        
+    Returns:
+        Same as run_group_iteration
+    """
+    work_dir, cmd = worker_copies.get()
+    try:
+        return run_group_iteration(test_class, cmd, work_dir, build_system, test_methods_for_group, timeout, env)
+    finally:
+        worker_copies.put((work_dir, cmd))
+
+def group_shard_count(test_count: int) -> int:
+    """
+    Number of shards each group iteration is split into, read from LLM4TG_PARALLEL_SHARDS.
+    
+    Sharding is off unless the variable is set: a number gives the shard count and
+    "auto" uses all but two of the available CPUs. Sharded tests no longer share a
+    JVM with the rest of the class, so interactions between shards are not seen.
+    
+    Args:
+        test_count: Number of test methods taking part in the group run
+        
+    Returns:
+        Shard count; 1 means the class runs in a single build
+    """
+    return min(configured_shard_count(), max(1, test_count))
+
+def configured_shard_count() -> int:
+    """Shard count set by LLM4TG_PARALLEL_SHARDS (see group_shard_count), before capping it by the test count."""
+    setting = os.environ.get(_PARALLEL_SHARDS_ENV, "").strip().lower()
+    if setting == "auto":
+        shard_count = available_cpus() - 2
+    else:
+        try:
+            shard_count = int(setting) if setting else 1
+        except ValueError:
+            shard_count = 1
+    return max(1, shard_count)
+
+@functools.lru_cache(maxsize=1)
+def _test_durations() -> Dict[str, float]:
+    """
+    Recorded test method run times, loaded from _TEST_DURATIONS_FILE once per process.
+    
+    The returned dict is updated in place by record_test_durations.
+    """
+    try:
+        durations = json.loads(_TEST_DURATIONS_FILE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(durations, dict):
+        return {}
+    return {key: float(value) for key, value in durations.items() if isinstance(value, (int, float))}
+
+def record_test_durations(test_class: str, durations: Dict[str, float]) -> None:
+    """
+    Fold the run times of one run into the recorded averages and save them.
+    
+    Args:
+        test_class: Fully qualified test class name
+        durations: Run time in seconds by test method name (see parse_junit_xml_testcases)
+    """
+    if not durations:
+        return
+    with _test_durations_lock:
+        recorded = _test_durations()
+        for method_name, duration in durations.items():
+            key = f"{test_class}#{method_name}"
+            previous = recorded.get(key)
+            recorded[key] = duration if previous is None else previous + _TEST_DURATION_WEIGHT * (duration - previous)
+        
+        try:
+            _TEST_DURATIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial file
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=_TEST_DURATIONS_FILE.parent, suffix='.tmp', delete=False) as temp_file:
+                json.dump(recorded, temp_file)
+            os.replace(temp_file.name, _TEST_DURATIONS_FILE)
+        except OSError as e:
+            print(f"   {warning('Could not save test durations:')} {e}")
+
+def partition_by_duration(test_class: str, test_methods: List[str], shard_count: int) -> List[List[str]]:
+    """
+    Split test methods into shards of similar total run time (longest processing time first).
+    
+    Methods are taken in order of decreasing recorded run time and each goes to the shard
+    with the least time so far. Without any recorded times, every method counts as
+    _DEFAULT_TEST_DURATION and the methods are dealt round-robin.
+    
+    Args:
+        test_class: Fully qualified test class name
+        test_methods: Test methods to split
+        shard_count: Number of shards
+        
+    Returns:
+        One list of test methods per shard, each in the order of test_methods
+    """
+    recorded = _test_durations()
+    durations = [recorded.get(f"{test_class}#{method_name}", _DEFAULT_TEST_DURATION) for method_name in test_methods]
+    
+    # (total run time, shard index); ties go to the lowest shard index
+    shard_loads = [(0.0, shard_index) for shard_index in range(shard_count)]
+    shard_method_indices = [[] for _ in range(shard_count)]
+    for method_index in sorted(range(len(test_methods)), key=lambda index: -durations[index]):
+        load, shard_index = heapq.heappop(shard_loads)
+        shard_method_indices[shard_index].append(method_index)
+        heapq.heappush(shard_loads, (load + durations[method_index], shard_index))
+    
+    return [[test_methods[method_index] for method_index in sorted(method_indices)] for method_indices in shard_method_indices]
+
+@functools.lru_cache(maxsize=1)
+def _shard_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """
+    Thread pool dispatching the shards of group iterations.
+    
+    A single pool is created on first use and reused by every later iteration and
+    test class, instead of starting a new pool (and its threads) for each iteration.
+    It is sized to the configured shard count, which bounds the shards of every
+    iteration whatever its test count, and its idle threads are joined when the
+    interpreter exits.
+    
+    Returns:
+        Shared executor with one worker per configured shard
+    """
+    return concurrent.futures.ThreadPoolExecutor(max_workers=configured_shard_count(), thread_name_prefix="group-shard")
+
+def run_group_iteration_sharded(
+    test_class: str,
+    shard_copies: List[Path],
+    build_system: BuildSystem,
+    test_methods_for_group: List[str],
+    timeout: int,
+    env: Dict[str, str],
+    offline: bool = False
+) -> Tuple[Dict[str, bool], Dict[str, Optional[str]], Optional[Tuple[int, int, int, bool]]]:
+    """
+    Run one group iteration as method shards side by side, one shard per worker copy.
+    
+    Test methods are split over the copies by their recorded run times (see
+    partition_by_duration); each shard is a regular group iteration restricted to its
+    methods, and the shard results are merged afterwards. The run times from the shard
+    reports are recorded for the next split.
+    
+    Args:
+        test_class: Fully qualified test class name
+        shard_copies: Worker copies of the repository, one per shard
+        build_system: Build system type
+        test_methods_for_group: Test methods taking part in the group run
+        timeout: Timeout in seconds for each shard
+        env: Environment for the build process
+        offline: Skip remote repository checks (see group_test_command)
+        
+    Returns:
+        Same as run_group_iteration
+        
+    Raises:
+        subprocess.TimeoutExpired: If a shard exceeds the timeout
+    """
+    shard_count = len(shard_copies)
+    
+    iteration_results = {}
+    iteration_failures = {}
+    shard_summaries = []
+    shard_executor = _shard_executor()
+    # Run times per shard, filled from each shard's own fresh report only, so a shard
+    # that wrote no report does not feed the previous iteration's times back in
+    shard_futures = {}
+    for work_dir, shard_methods in zip(shard_copies, partition_by_duration(test_class, test_methods_for_group, shard_count)):
+        shard_cmd = group_test_command(test_class, work_dir, build_system, offline, shard_methods)
+        shard_durations = {}
+        shard_futures[shard_executor.submit(
+            run_group_iteration, test_class, shard_cmd, work_dir, build_system, shard_methods, timeout, env, shard_durations
+        )] = shard_durations
+    
+    iteration_durations = {}
+    try:
+        for future in concurrent.futures.as_completed(shard_futures):
+            shard_results, shard_failures, shard_summary = future.result()
+            iteration_durations.update(shard_futures[future])
+            for key, value in shard_results.items():
+                if key.startswith('_'):
+                    # Build system counts ("_maven_total", ...) add up over the shards
+                    iteration_results[key] = iteration_results.get(key, 0) + value
+                else:
+                    iteration_results[key] = value
+            iteration_failures.update(shard_failures)
+            if shard_summary:
+                shard_summaries.append(shard_summary)
+    finally:
+        # The pool outlives this call, so wait for the other shards here before the
+        # worker copies are reused (or removed) by the caller
+        concurrent.futures.wait(shard_futures)
+    
+    record_test_durations(test_class, iteration_durations)
+    
+    iteration_summary = None
+    if shard_summaries:
+        iteration_summary = (
+            sum(shard_summary[0] for shard_summary in shard_summaries),
+            sum(shard_summary[1] for shard_summary in shard_summaries),
+            sum(shard_summary[2] for shard_summary in shard_summaries),
+            any(shard_summary[3] for shard_summary in shard_summaries)
+        )
+    return iteration_results, iteration_failures, iteration_summary
+
 def run_test_class(
     test_class: str, 
     repo_path: Path, 
@@ -246,7 +1778,8 @@ def run_test_class(
     junit_version: int = None,
     llm_client = None,
     args = None,
-    mut_body: str = None
+    mut_body: str = None,
+    force_clean: bool = False
 ) -> Tuple[Dict[str, bool], Dict[str, str], Dict[str, str]]:
     """
     Run all tests in a test class both individually and then all together.
@@ -266,6 +1799,7 @@ def run_test_class(
         llm_client: The LLM client for runtime fix loop
         args: The arguments for runtime fix loop
         mut_body: The mut_body for runtime fix loop
+        force_clean: Clean the build output before the group runs instead of recompiling incrementally
         
     Returns:
         Tuple of (individual_results: Dict[str, bool], 
@@ -274,25 +1808,16 @@ def run_test_class(
     
     try:
         # First, extract test method names from the test file
-        class_name = test_class.split('.')[-1]
-        package = '.'.join(test_class.split('.')[:-1])
+        package, _, class_name = test_class.rpartition('.')
         
         # Find the test file - use provided path or construct from test_class
         if test_file_path is None:
             test_file_path = repo_path / "src" / "test" / "java" / package.replace('.', '/') / f"{class_name}.java"
         
-        # Set environment variables
-        env = os.environ.copy()
-        # Get Java version and path from global config (like compile_java_file.py does)
-        java_version = test_config.get_java_version()
+        # Set environment variables (built once per Java path and reused)
         java_path = test_config.get_java_path()
-        
-        if java_path:
-            env['JAVA_HOME'] = java_path
-            env['PATH'] = f"{java_path}/bin:{env['PATH']}"
-            if build_system == "gradle":
-                env['GRADLE_OPTS'] = f"-Dorg.gradle.java.home={java_path}"
-        else:
+        env = _test_env(build_system, java_path)
+        if not java_path:
             print("WARNING: Java path not set in test_config")
         
         all_output = []
@@ -310,25 +1835,124 @@ def run_test_class(
         total_tests_fixed_count = 0   # Total tests fixed by RFL
         fixed_tests_set = set()       # Track which tests were fixed (avoid duplicates)
         
-        # Initialize recent successful tests for runtime fix loop
-        recent_successful_tests = []
+        # Initialize recent successful tests for runtime fix loop; the deque drops the
+        # oldest example once max_runtime_fix_examples is reached
+        recent_successful_tests = collections.deque(
+            maxlen=max(0, args.max_runtime_fix_examples) if args and hasattr(args, 'max_runtime_fix_examples') else None
+        )
+        
+        # Map each test method name to its position in final_tests (first occurrence wins)
+        method_index = {}
+        for i, (scenario, test_method) in enumerate(final_tests or []):
+            method_name_match = _METHOD_DECL_RE.search(test_method)
+            if method_name_match:
+                method_index.setdefault(method_name_match.group(1), i)
         
         # Initialize individual test entries in JSON logger
         if json_logger and final_tests:
             for scenario, test_method in final_tests:
-                method_name_match = re.search(r'public\s+void\s+(\w+)\s*\(', test_method)
+                method_name_match = _METHOD_DECL_RE.search(test_method)
                 if method_name_match:
                     method_name = method_name_match.group(1)
         
+        # Warm up the Gradle daemon once so every per-test invocation below reuses it;
+        # for Maven, let a pending mvnd warmup finish before the first build
+        if build_system == "gradle":
+            warm_gradle_daemon(gradle_command_prefix(repo_path), repo_path, env)
+        else:
+            await_daemon_warmup(repo_path)
+        
         # STEP 1: Run each test method individually (isolated)
         print(f"{Colors.CYAN}[INFO]{Colors.RESET} STEP 1: Running tests individually (isolated)\n")
         
         # Use final_tests for direct execution
         if final_tests:
-            # Direct execution from final_tests tuple
+            # Use the same class name as the final assembled test file
+            isolated_test_file = test_file_path.parent / f"{class_name}.java"
+            
+            # The isolated test command only depends on the class, so build it once
+            isolated_cmd = isolated_test_command(test_class, repo_path, build_system)
+            
+            isolated_tests = {}
+            for idx, (scenario, test_method) in enumerate(final_tests, 1):
+                method_name_match = _METHOD_DECL_RE.search(test_method)
+                if method_name_match:
+                    method_name = method_name_match.group(1)
+                    isolated_tests[idx] = (method_name, create_isolated_test_bytes(test_method, method_name, class_name, package, scaffold))
+            
+            # With the isolated result cache enabled, tests that already ran with the same
+            # file content against the same compiled classes and classpath reuse that result;
+            # runtime errors still run, since their output feeds the classification and fixes
+            cached_results = load_isolated_results(repo_path)
+            isolated_keys = {}
+            classes_fingerprint = compiled_classes_fingerprint(repo_path, build_system, test_class) if os.environ.get(_ISOLATED_RESULT_CACHE_ENV) else None
+            if classes_fingerprint:
+                isolated_keys = {idx: isolated_result_key(isolated_test_bytes, classes_fingerprint) for idx, (_, isolated_test_bytes) in isolated_tests.items()}
+            # Outcomes known without an isolated run of their own: (test_success, test_output, failure_category)
+            known_results = {}
+            for idx, key in isolated_keys.items():
+                cached_result = cached_results.get(key)
+                if cached_result and (cached_result.get('success') is True or cached_result.get('failure_category') == "assertion_error"):
+                    known_results[idx] = (cached_result['success'], "", cached_result.get('failure_category'))
+            if known_results:
+                print(f"   {info(f'{len(known_results)}/{len(isolated_tests)} tests unchanged since their last run, reusing their results')}")
+            
+            # Run every test once in a single build (one fresh JVM per test); only the
+            # tests that did not pass there need a build of their own below
+            # --parallel-tests bounds both the test JVMs of the batch and the isolated
+            # workers; 0 means one per available CPU, and never more than there are CPUs
+            configured_parallel_tests = args.parallel_tests if args and hasattr(args, 'parallel_tests') else 1
+            if configured_parallel_tests == 0:
+                configured_parallel_tests = available_cpus()
+            configured_parallel_tests = max(1, min(configured_parallel_tests, available_cpus()))
+            
+            uncached_tests = {idx: isolated_test for idx, isolated_test in isolated_tests.items() if idx not in known_results}
+            if len(uncached_tests) > 1:
+                batch_forks = min(configured_parallel_tests, len(uncached_tests))
+                newly_passed = run_isolated_batch(test_class, uncached_tests, isolated_test_file.parent, repo_path, build_system, timeout, env, batch_forks)
+                print(f"   {info(f'{len(newly_passed)}/{len(uncached_tests)} tests passed in the batched isolated run')}")
+                known_results.update((idx, (True, "", None)) for idx in newly_passed)
+            # (test_success, failure_category) of this run's tests, for the isolated result cache
+            new_results = {}
+            
+            # Run isolated tests on a thread pool when requested; each worker owns a
+            # scratch copy of the repository so the isolated test files never collide
+            # Never use more workers than tests left to run
+            parallel_tests = max(1, min(configured_parallel_tests, len(isolated_tests) - len(known_results)))
+            executor = None
+            pending_runs = {}
+            if parallel_tests > 1:
+                try:
+                    relative_test_file = isolated_test_file.relative_to(repo_path)
+                    worker_copies = queue.Queue()
+                    for worker_copy in create_worker_copies(repo_path, parallel_tests):
+                        worker_copies.put((worker_copy, isolated_test_command(test_class, worker_copy, build_system)))
+                    print(f"   {info(f'Running isolated tests with {parallel_tests} parallel workers')}")
+                except Exception as e:
+                    print(f"   {warning('Parallel test execution unavailable, running sequentially:')} {e}")
+                    remove_worker_copies(repo_path)
+                    parallel_tests = 1
+            
+            if parallel_tests > 1:
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=parallel_tests)
+                for idx, (method_name, isolated_test_bytes) in isolated_tests.items():
+                    if idx not in known_results:
+                        pending_runs[idx] = executor.submit(
+                            run_isolated_test_in_worker_copy,
+                            worker_copies,
+                            relative_test_file,
+                            isolated_test_bytes,
+                            test_class,
+                            build_system,
+                            timeout,
+                            env
+                        )
+            
+            # Direct execution from final_tests tuple; results are handled in order on this
+            # thread, so the runtime-fix loop below stays serial
             for idx, (scenario, test_method) in enumerate(final_tests, 1):
                 # Extract test method name directly from the method content
-                method_name_match = re.search(r'public\s+void\s+(\w+)\s*\(', test_method)
+                method_name_match = _METHOD_DECL_RE.search(test_method)
                 if method_name_match:
                     method_name = method_name_match.group(1)
                 else:
@@ -337,76 +1961,34 @@ def run_test_class(
                 
                 print(f"   ✓ Running test {method_name}")
                 
-                # Create an isolated test file for this specific test method
-                isolated_test_content = create_isolated_test_with_scaffold(
-                    test_method, method_name, class_name, package, scaffold
-                )
-                
-                # Use the same class name as the final assembled test file
-                isolated_test_file = test_file_path.parent / f"{class_name}.java"
-                isolated_test_file.write_text(isolated_test_content)
-                
                 try:
-                    # Run the individual test
-                    if build_system == "gradle":
-                        gradle_wrapper = repo_path / "gradlew"
-                        if gradle_wrapper.exists():
-                            gradle_wrapper.chmod(0o755)
-                            cmd = [str(gradle_wrapper), "test", f"--tests={test_class}", "--stacktrace"]
-                        else:
-                            cmd = ["gradle", "test", f"--tests={test_class}", "--stacktrace"]
-                            
-                    elif build_system == "maven":
-                        cmd = ["mvn", "test", f"-Dtest={class_name}", "-e", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
+                    # Run the individual test in an isolated test file for this specific test method
+                    if idx in known_results:
+                        test_success, test_output, report_category = known_results[idx]
+                    elif idx in pending_runs:
+                        test_success, test_output, report_category = pending_runs[idx].result()
                     else:
-                        raise ValueError(f"Unsupported build system: {build_system}")
-                    
-                    result = subprocess.run(
-                        cmd,
-                        cwd=repo_path,
-                        capture_output=True,
-                        text=True,
-                        timeout=timeout,
-                        env=env
-                    )
-                    
-                    # Combine stdout and stderr
-                    test_output = result.stdout + "\n" + result.stderr
-                    
-                    # Determine success based on exit code and output
-                    test_success = result.returncode == 0
-                    
-                    # Parse the output to get more accurate test results
-                    # Look for patterns like "1 test completed, 0 failed" or "1 test completed, 1 failed"
-                    test_completion_pattern = re.search(r'(\d+) tests? completed, (\d+) failed', test_output)
-                    if test_completion_pattern:
-                        total_tests = int(test_completion_pattern.group(1))
-                        failed_tests = int(test_completion_pattern.group(2))
-                        passed_tests = total_tests - failed_tests
-                        
-                        # If there are failed tests, the test failed
-                        if failed_tests > 0:
-                            test_success = False
-                        else:
-                            test_success = True
-                    else:
-                        # Fallback: look for test failure patterns in the output
-                        # Check for Gradle test failure patterns like "ClassName > methodName FAILED"
-                        if ' > ' in test_output and ' FAILED' in test_output:
-                            test_success = False
-                        elif 'BUILD SUCCESSFUL' in test_output and 'FAILED' not in test_output:
-                            # If build is successful and no FAILED pattern found, assume test passed
-                            test_success = True
-                        else:
-                            # Fallback to build success/failure
-                            test_success = result.returncode == 0
+                        test_success, test_output, report_category = run_isolated_test(
+                            test_class,
+                            isolated_test_file,
+                            isolated_tests[idx][1],
+                            repo_path,
+                            isolated_cmd,
+                            build_system,
+                            timeout,
+                            env
+                        )
                     
                     individual_results[method_name] = test_success
+                    if test_success and idx in isolated_keys:
+                        new_results[isolated_keys[idx]] = (True, None)
                     
-                    # Categorize failure if test failed
+                    # Categorize failure if test failed (from the JUnit report when there was one)
                     if not test_success:
-                        failure_category = categorize_test_failure(test_output, build_system)
+                        failure_category = report_category or categorize_test_failure(test_output, build_system)
                         individual_failures[method_name] = failure_category
+                        if idx in isolated_keys:
+                            new_results[isolated_keys[idx]] = (False, failure_category)
                         overall_success = False
                         # Show concise failure status
                         failure_type = failure_category.replace('_', ' ').title()
@@ -421,9 +2003,6 @@ def run_test_class(
                             # Check if this test method is already in the list to avoid duplicates
                             if test_method not in recent_successful_tests:
                                 recent_successful_tests.append(test_method)
-                                # Keep only the most recent examples
-                                if args and hasattr(args, 'max_runtime_fix_examples') and len(recent_successful_tests) > args.max_runtime_fix_examples:
-                                    recent_successful_tests.pop(0)
                             else:
                                 print(f"   {info('Test method already in examples list (skipping duplicate)')}")
                         
@@ -511,7 +2090,7 @@ def run_test_class(
                                     runtime_error_output=test_output,
                                     test_class=test_class,
                                     max_attempts=args.max_runtime_fix_attempts,
-                                    recent_successful_tests=recent_successful_tests,
+                                    recent_successful_tests=list(recent_successful_tests),
                                     max_examples=args.max_runtime_fix_examples,
                                     mut_body=mut_body
                                 )
@@ -540,19 +2119,19 @@ def run_test_class(
                                         print(f"   {error('Fixed test method fails with assertion error')}")
                                     
                                     # Update final_tests with the fixed method
-                                    for i, (scenario, original_test_method) in enumerate(final_tests):
-                                        # Extract method name from original test method
-                                        original_method_name_match = re.search(r'public\s+void\s+(\w+)\s*\(', original_test_method)
-                                        if original_method_name_match and original_method_name_match.group(1) == method_name:
-                                            # Replace the original test method with the fixed one
-                                            final_tests[i] = (scenario, final_test_method)
-                                            break
+                                    test_index = method_index.get(method_name)
+                                    if test_index is not None:
+                                        # Replace the original test method with the fixed one
+                                        final_tests[test_index] = (final_tests[test_index][0], final_test_method)
+                                        
+                                        # Keep the index map in sync if the fix renamed the method
+                                        fixed_name_match = _METHOD_DECL_RE.search(final_test_method)
+                                        if fixed_name_match and fixed_name_match.group(1) != method_name:
+                                            del method_index[method_name]
+                                            method_index.setdefault(fixed_name_match.group(1), test_index)
                                     
                                     # Add the fixed test method to recent successful tests
                                     recent_successful_tests.append(final_test_method)
-                                    # Keep only the most recent examples
-                                    if len(recent_successful_tests) > args.max_runtime_fix_examples:
-                                        recent_successful_tests.pop(0)
                                     
                                     # Log successful runtime fix
                                     if json_logger:
@@ -589,9 +2168,6 @@ def run_test_class(
                         print(f"   {success('Passed')}")
                         # Add successful test to recent successful tests for runtime fix examples
                         recent_successful_tests.append(test_method)
-                        # Keep only the most recent examples
-                        if args and hasattr(args, 'max_runtime_fix_examples') and len(recent_successful_tests) > args.max_runtime_fix_examples:
-                            recent_successful_tests.pop(0)
                         
                         # Log test that didn't use runtime fix
                         if json_logger:
@@ -603,7 +2179,9 @@ def run_test_class(
                         assertion_failure_count = sum(1 for failure_type in individual_failures.values() 
                                                     if failure_type == "assertion_error")
                         save_assertion_failure_file(
-                            isolated_test_content=isolated_test_content,
+                            isolated_test_content=create_isolated_test_with_scaffold(
+                                test_method, method_name, class_name, package, scaffold
+                            ),
                             method_name=method_name,
                             class_name=class_name,
                             package=package,
@@ -635,11 +2213,11 @@ def run_test_class(
                     # Log exception test that didn't use runtime fix
                     if json_logger:
                         pass  # RFL logging removed
-                
-                finally:
-                    # Clean up the isolated test file
-                    if isolated_test_file.exists():
-                        isolated_test_file.unlink()
+            
+            if executor:
+                executor.shutdown(wait=True)
+                remove_worker_copies(repo_path)
+            save_isolated_results(repo_path, cached_results, new_results)
             
             # Store the test methods list for group execution
             test_methods = list(individual_results.keys())
@@ -658,18 +2236,21 @@ def run_test_class(
         
         if timeout_tests:
             print(f"\n{warning('Excluding')} {len(timeout_tests)} timeout tests from group runs: {timeout_tests}")
+            excluded_tests = frozenset(timeout_tests)
             test_methods_for_group = [method for method in test_methods 
-                                     if method not in timeout_tests]
+                                     if method not in excluded_tests]
             
             # Create a filtered version of the test content that excludes timeout tests
             print(f"{info('Creating filtered test file content (excluding timeout tests)...')}")
-            # Create the test content from passing tests
-            passing_tests = [(scenario, test_method) for scenario, test_method in final_tests 
-                           if individual_results.get(re.search(r'public\s+void\s+(\w+)\s*\(', test_method).group(1), False)]
+            # Create the test content from passing tests, kept in final_tests order
+            passing_tests = [final_tests[i] for i in sorted(
+                method_index[method_name] for method_name, passed in individual_results.items()
+                if passed and method_name in method_index
+            )]
             filtered_test_content = create_filtered_test_content_from_tuples(passing_tests, timeout_tests, class_name, scaffold)
             
             # Write the filtered test file to disk before running group tests
-            test_file_path.write_text(filtered_test_content)
+            test_file_path.write_bytes(filtered_test_content.encode('utf-8'))
         else:
             test_methods_for_group = test_methods
             
@@ -677,7 +2258,11 @@ def run_test_class(
             test_content = create_test_content_from_tuples(final_tests, class_name, scaffold)
             
             # Write the original test file to disk before running group tests
-            test_file_path.write_text(test_content)
+            test_file_path.write_bytes(test_content.encode('utf-8'))
+        
+        # Bump the mtime so incremental compilation always sees the rewritten test file as stale,
+        # even if it lands in the same filesystem timestamp tick as the last isolated build
+        os.utime(test_file_path, None)
         
         # Show which tests were excluded from analysis
         if timeout_tests:
@@ -685,383 +2270,129 @@ def run_test_class(
             for i, method_name in enumerate(timeout_tests, 1):
                 print(f"   {i}. {method_name}")
         
-        # Force recompilation to ensure Maven uses the updated test file
+        # Recompile so the build uses the updated test file; Maven and Gradle only rebuild
+        # what changed, so a clean is only done when explicitly requested
+        clean_goal = ["clean"] if force_clean else []
         if build_system == "gradle":
-            gradle_wrapper = repo_path / "gradlew"
-            if gradle_wrapper.exists():
-                gradle_wrapper.chmod(0o755)
-                clean_cmd = [str(gradle_wrapper), "clean", "testClasses"]
-            else:
-                clean_cmd = ["gradle", "clean", "testClasses"]
+            compile_cmd = gradle_command_prefix(repo_path) + clean_goal + ["testClasses", _GRADLE_BUILD_CACHE_ARG] + _GRADLE_DAEMON_ARGS + gradle_configuration_cache_args(repo_path)
         elif build_system == "maven":
-            clean_cmd = ["mvn", "clean", "test-compile", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
+            compile_cmd = [maven_executable()] + clean_goal + ["test-compile", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
+            if maven_build_cache_configured(repo_path):
+                compile_cmd.append("-Dmaven.build.cache.enabled=true")
         else:
             raise ValueError(f"Unsupported build system: {build_system}")
         
+        # A successful compile has resolved every dependency the tests need, so the
+        # group iterations can skip the remote repository checks
+        group_offline = False
         try:
-            subprocess.run(
-                clean_cmd,
+            compile_result = subprocess.run(
+                compile_cmd,
                 cwd=repo_path,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,  # Only the exit code is used
+                stderr=subprocess.DEVNULL,
                 timeout=timeout,
-                env=env
+                env=env,
+                close_fds=False
             )
+            group_offline = compile_result.returncode == 0
         except Exception as e:
             print(f"   {warning('Recompilation failed:')} {e}")
         
         # STEP 2: Run all tests together 5 times to filter flaky tests
         print(f"\n\n{Colors.CYAN}[INFO]{Colors.RESET} STEP 2: Running tests in group (5 iterations)\n")
         
-        if build_system == "gradle":
-            gradle_wrapper = repo_path / "gradlew"
-            if gradle_wrapper.exists():
-                gradle_wrapper.chmod(0o755)
-                cmd = [str(gradle_wrapper), "test", f"--tests={test_class}"]
-            else:
-                cmd = ["gradle", "test", f"--tests={test_class}"]
-                
-        elif build_system == "maven":
-            cmd = ["mvn", "test", f"-Dtest={class_name}", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
-        else:
-            raise ValueError(f"Unsupported build system: {build_system}")
-        
         # Run the group test 5 times to filter flaky tests
         group_test_results = []  # Store results from each iteration
         group_failures = {}  # Track failure categories for group tests
         
+        # Iterations are independent runs, so with parallel tests enabled they run
+        # concurrently in worker copies; results are still merged in iteration order below
+        group_workers = args.parallel_tests if args and hasattr(args, 'parallel_tests') else 1
+        if group_workers == 0:
+            group_workers = available_cpus()
+        group_workers = max(1, min(group_workers, available_cpus(), 5))
+        cmd = group_test_command(test_class, repo_path, build_system, group_offline)
+        group_timeout = timeout * 2  # Give more time for all tests
+        
+        # With sharding enabled, every iteration is split over worker copies instead
+        shard_copies = []
+        shard_count = group_shard_count(len(test_methods_for_group))
+        if shard_count > 1:
+            try:
+                shard_copies = create_worker_copies(repo_path, shard_count)
+                group_workers = 1
+                print(f"{info(f'Splitting each group iteration into {shard_count} parallel shards')}")
+            except Exception as e:
+                print(f"{warning('Sharded group execution unavailable, running the whole class:')} {e}")
+                remove_worker_copies(repo_path)
+                shard_copies = []
+        
+        group_executor = None
+        pending_iterations = {}
+        if group_workers > 1:
+            try:
+                group_copies = queue.Queue()
+                for worker_copy in create_worker_copies(repo_path, group_workers):
+                    group_copies.put((worker_copy, group_test_command(test_class, worker_copy, build_system, group_offline)))
+                group_executor = concurrent.futures.ThreadPoolExecutor(max_workers=group_workers)
+                for iteration in range(5):
+                    pending_iterations[iteration] = group_executor.submit(
+                        run_group_iteration_in_worker_copy,
+                        test_class,
+                        group_copies,
+                        build_system,
+                        test_methods_for_group,
+                        group_timeout,
+                        env
+                    )
+                print(f"{info(f'Running group iterations with {group_workers} parallel workers')}")
+            except Exception as e:
+                print(f"{warning('Parallel group execution unavailable, running sequentially:')} {e}")
+                remove_worker_copies(repo_path)
         
+        iterations_run = 0
+        previous_outcomes = None
         for iteration in range(5):
             try:
                 print(f"{info(f'Group execution iteration {iteration + 1}/5')}")
-                # Run all tests together
-                result = subprocess.run(
-                    cmd,
-                    cwd=repo_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout * 2,  # Give more time for all tests
-                    env=env
-                )
-                
-                group_output = result.stdout + "\n" + result.stderr
-                group_success = result.returncode == 0
-                
-                # Remove ANSI color codes to facilitate parsing
-                clean_group_output = remove_ansi_colors(group_output)
+                if iteration in pending_iterations:
+                    iteration_results, iteration_failures, iteration_summary = pending_iterations[iteration].result()
+                elif shard_copies:
+                    iteration_results, iteration_failures, iteration_summary = run_group_iteration_sharded(
+                        test_class,
+                        shard_copies,
+                        build_system,
+                        test_methods_for_group,
+                        group_timeout,
+                        env,
+                        group_offline
+                    )
+                else:
+                    iteration_results, iteration_failures, iteration_summary = run_group_iteration(
+                        test_class,
+                        cmd,
+                        repo_path,
+                        build_system,
+                        test_methods_for_group,
+                        group_timeout,
+                        env
+                    )
                 
                 print(f"   ✓ Iteration {iteration + 1}:")
                 
-                # Parse the group output to get individual results from this iteration
-                group_individual_results = parse_test_output(clean_group_output, build_system)
-                
-                # For group runs, we need to infer which tests passed based on the summary and known test methods
-                iteration_results = {}
-                
-                if build_system == "maven":
-                    # Maven-specific parsing logic
-                    # Look for Maven test summary pattern: "Tests run: X, Failures: Y, Errors: Z"
-                    maven_summary_pattern = re.search(r'Tests run: (\d+), Failures: (\d+), Errors: (\d+)', clean_group_output)
-                    
-                    # Initialize failing_tests at the beginning of Maven parsing
-                    failing_tests = {}  # method_name -> failure_type
-                    
-                    if maven_summary_pattern:
-                        total_tests = int(maven_summary_pattern.group(1))
-                        failed_tests_count = int(maven_summary_pattern.group(2))
-                        error_tests_count = int(maven_summary_pattern.group(3))
-                        passed_tests_count = total_tests - failed_tests_count - error_tests_count
-                        
-                        # Parse the Maven output to find failing tests
-                        lines = clean_group_output.split('\n')
-                        in_failures_section = False
-                        in_errors_section = False
-                        
-                        for line in lines:
-                            line = line.strip()
-                            
-                            # Check for section headers
-                            if '[ERROR] Failures:' in line:
-                                in_failures_section = True
-                                in_errors_section = False
-                                continue
-                            elif '[ERROR] Errors:' in line:
-                                in_failures_section = False
-                                in_errors_section = True
-                                continue
-                            elif line.startswith('[ERROR]') and ('Failures:' in line or 'Errors:' in line):
-                                # Skip the header line itself
-                                continue
-                            elif line.startswith('[ERROR]') and not line.startswith('[ERROR]   '):
-                                # End of section
-                                in_failures_section = False
-                                in_errors_section = False
-                                continue
-                            
-                            # Parse failure lines
-                            if in_failures_section and line.startswith('[ERROR]   '):
-                                # Format: "[ERROR]   OrderByOperatorTest.testOrderByWithNonTextNodeFields:175 expected:<[Alic]e> but was:<[Charli]e>"
-                                # Or: "[ERROR]   OrderByOperatorTest.testOrderByWithNullInputAndSortFields Expected exception: java.lang.NullPointerException"
-                                # Extract the test method name
-                                # Remove the "[ERROR]   " prefix
-                                test_line = line.replace('[ERROR]   ', '').strip()
-                                # Extract method name from "ClassName.methodName:lineNumber" or "ClassName.methodName Expected exception:"
-                                # Updated regex to handle both formats
-                                match = re.search(r'(\w+)\.(\w+)(?::\d+|\s+Expected exception:)', test_line)
-                                if match:
-                                    test_name = match.group(2)  # Get the method name
-                                    failing_tests[test_name] = "assertion_error"
-                            
-                            # Parse error lines
-                            elif in_errors_section and line.startswith('[ERROR]   '):
-                                # Format: "[ERROR]   OrderByOperatorTest.testMethodName:123 » ExceptionName"
-                                # Or: "[ERROR]   OrderByOperatorTest.testMethodName » Unexpected exception, expected<...> but was<...>"
-                                test_line = line.replace('[ERROR]   ', '').strip()
-                                # Updated regex to handle both colon and arrow formats
-                                match = re.search(r'(\w+)\.(\w+)(?::\d+|\s*»)', test_line)
-                                if match:
-                                    test_name = match.group(2)  # Get the method name
-                                    failing_tests[test_name] = "runtime_error"
-                        
-                        # For each known test method, determine if it passed or failed in this iteration
-                        for method_name in test_methods_for_group:
-                            if method_name in failing_tests:
-                                # This test was explicitly reported as failed or errored
-                                failure_type = failing_tests[method_name]
-                                iteration_results[method_name] = False
-                                # Update the failure tracking for this iteration
-                                group_failures[method_name] = failure_type
-                            else:
-                                # This test was not reported as failed, so it must have passed
-                                iteration_results[method_name] = True
-                                # If this test passed in this iteration, only mark it as passed if we haven't seen it fail before
-                                if method_name not in group_failures:
-                                    group_failures[method_name] = None  # None means passed
-                        
-                        # Print clean summary for this iteration
-                        error_counts = count_error_types(group_failures, test_methods_for_group)
-                        error_breakdown = []
-                        if error_counts["assertion_error"] > 0:
-                            error_breakdown.append(f"{error_counts['assertion_error']} assertion")
-                        if error_counts["runtime_error"] > 0:
-                            error_breakdown.append(f"{error_counts['runtime_error']} runtime")
-                        if error_counts["timeout"] > 0:
-                            error_breakdown.append(f"{error_counts['timeout']} timeout")
-                        
-                        error_info = f" ({', '.join(error_breakdown)})" if error_breakdown else ""
-                        print(f"   {summary(f'{total_tests} total, {passed_tests_count} passed, {failed_tests_count + error_tests_count} failed')}{error_info}")
-                        print()
-                        
-                        # Store the actual Maven counts for later use
-                        iteration_results['_maven_total'] = total_tests
-                        iteration_results['_maven_failures'] = failed_tests_count
-                        iteration_results['_maven_errors'] = error_tests_count
-                    
-                    # Additional fallback: if we still have no failing tests but Maven reported errors/failures,
-                    # try parsing the "Results :" section which has a different format
-                    if not failing_tests and maven_summary_pattern and (failed_tests_count > 0 or error_tests_count > 0):
-                        # Look for "Results :" section
-                        results_section = False
-                        for line in clean_group_output.split('\n'):
-                            if 'Results :' in line:
-                                results_section = True
-                                continue
-                            elif results_section and line.strip() == '':
-                                # End of results section (empty line)
-                                break
-                            elif results_section and line.strip():
-                                # Parse lines like:
-                                # "Tests in error:"
-                                # "  testMethodName(className): error message"
-                                # "Failed tests:"
-                                # "  testMethodName(className): failure message"
-                                
-                                if 'Tests in error:' in line:
-                                    current_section = 'error'
-                                    continue
-                                elif 'Failed tests:' in line:
-                                    current_section = 'failure'
-                                    continue
-                                elif line.startswith('  ') and '(' in line and '):' in line:
-                                    # Extract test method name from indented line
-                                    # Format: "  testMethodName(className): message"
-                                    match = re.search(r'(\w+)\([^)]+\):', line.strip())
-                                    if match:
-                                        test_name = match.group(1)
-                                        if current_section == 'error':
-                                            failing_tests[test_name] = "runtime_error"
-                                        elif current_section == 'failure':
-                                            failing_tests[test_name] = "assertion_error"
-                    
-                    # Additional fallback: if we still have no failing tests but Maven reported errors/failures,
-                    # try parsing the direct "Failed tests:" and "Tests in error:" sections
-                    if not failing_tests and maven_summary_pattern and (failed_tests_count > 0 or error_tests_count > 0):
-                        lines = clean_group_output.split('\n')
-                        current_section = None
-                        
-                        for line in lines:
-                            line = line.strip()
-                            
-                            # Check for section headers
-                            if 'Failed tests:' in line:
-                                current_section = 'failure'
-                                # Check if there's a test on the same line as the header
-                                if '(' in line and '):' in line:
-                                    # Extract test from the same line as header
-                                    # Find the part after "Failed tests:"
-                                    test_part = line.split('Failed tests:')[1].strip()
-                                    # More robust regex to capture test method names
-                                    match = re.search(r'([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\):', test_part)
-                                    if match:
-                                        test_name = match.group(1)
-                                        failing_tests[test_name] = "assertion_error"
-                                continue
-                            elif 'Tests in error:' in line:
-                                current_section = 'error'
-                                continue
-                            elif line.startswith('Tests run:') or line.startswith('[INFO]') or line.startswith('[ERROR]'):
-                                # End of test results section
-                                current_section = None
-                                continue
-                            
-                            # Parse test lines in current section
-                            if current_section and line and '(' in line and '):' in line:
-                                # Extract test method name from line
-                                # Format: "testMethodName(className): message" or "  testMethodName(className): message"
-                                # More robust regex to capture test method names
-                                match = re.search(r'([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\):', line)
-                                if match:
-                                    test_name = match.group(1)
-                                    if current_section == 'failure':
-                                        failing_tests[test_name] = "assertion_error"
-                                    elif current_section == 'error':
-                                        failing_tests[test_name] = "runtime_error"
-                    
-                    # Use the failing_tests information to set iteration_results for each test method
-                    if failing_tests:
-                        # For each known test method, determine if it passed or failed in this iteration
-                        for method_name in test_methods_for_group:
-                            if method_name in failing_tests:
-                                # This test was explicitly reported as failed or errored
-                                failure_type = failing_tests[method_name]
-                                iteration_results[method_name] = False
-                                # Update the failure tracking for this iteration
-                                group_failures[method_name] = failure_type
-                            else:
-                                # This test was not reported as failed, so it must have passed
-                                iteration_results[method_name] = True
-                                # If this test passed in this iteration, only mark it as passed if we haven't seen it fail before
-                                if method_name not in group_failures:
-                                    group_failures[method_name] = None  # None means passed
-                    
-                    # Fallback: if no Maven summary found, use the parsed results as-is
-                    if not maven_summary_pattern:
-                        iteration_results = group_individual_results
-                        
-                        # Handle the case where parse_test_output returns {'all_tests': True/False}
-                        if 'all_tests' in group_individual_results:
-                            all_tests_passed = group_individual_results['all_tests']
-                            # Map the overall result to all individual test methods
-                            for method_name in test_methods_for_group:
-                                iteration_results[method_name] = all_tests_passed
-                                if all_tests_passed:
-                                    if method_name not in group_failures:
-                                        group_failures[method_name] = None  # None means passed
-                                else:
-                                    group_failures[method_name] = "assertion_error"
-                            
-                            if all_tests_passed:
-                                # Print simple summary for fallback case
-                                total_tests = len(test_methods_for_group)
-                                passed_tests_count = total_tests
-                                failed_tests_count = 0
-                                print(f"   {summary(f'{total_tests} total, {passed_tests_count} passed, {failed_tests_count} failed')}")
-                                print()
-
-                        else:
-                            # For fallback, we can't determine failure types, so mark all failures as assertion_error
-                            for method_name, result in iteration_results.items():
-                                if not result:  # False means failed
-                                    group_failures[method_name] = "assertion_error"
-                                elif method_name not in group_failures:
-                                    group_failures[method_name] = None  # None means passed
-                
+                # Merge in iteration order: a failure in any iteration overrides a pass
+                for method_name, failure_type in iteration_failures.items():
+                    if failure_type is not None:
+                        group_failures[method_name] = failure_type
+                    elif method_name not in group_failures:
+                        group_failures[method_name] = None  # None means passed
                 
-                elif build_system == "gradle":
-                    # Gradle-specific parsing logic for group tests
-                    # Look for Gradle test summary pattern: "X tests completed, Y failed"
-                    gradle_summary_pattern = re.search(r'(\d+) tests? completed, (\d+) failed', clean_group_output)
-                    if gradle_summary_pattern:
-                        total_tests = int(gradle_summary_pattern.group(1))
-                        failed_tests_count = int(gradle_summary_pattern.group(2))
-                        passed_tests_count = total_tests - failed_tests_count
-                        
-                        # Track failure types for individual tests
-                        failing_tests = {}  # method_name -> failure_type
-                        
-                        # Parse the Gradle output to find failing tests
-                        lines = clean_group_output.split('\n')
-                        
-                        for i, line in enumerate(lines):
-                            line = line.strip()
-                            
-                            # Look for Gradle test failure pattern: "ClassName > methodName FAILED"
-                            if ' > ' in line and ' FAILED' in line:
-                                # Extract the test method name from the failure line
-                                # Format: "com.fishercoder.solutions._235Test > recursiveCallToLeftSubtree FAILED"
-                                match = re.search(r'(\w+) > (\w+) FAILED', line)
-                                if match:
-                                    test_name = match.group(2)  # Get the method name
-                                    
-                                    # Determine failure type by looking at the next line using format-based parsing
-                                    failure_type = "assertion_error"  # Default
-                                    if i + 1 < len(lines):
-                                        next_line = lines[i + 1].strip()
-                                        original_next_line = lines[i + 1]  # Keep original for indentation check
-                                        
-                                        # Runtime error format: indented line starting with exception class name
-                                        # Pattern: "    org.package.ExceptionName at File.java:line"
-                                        if original_next_line.startswith('    ') and len(next_line.split()) > 0:
-                                            first_word = next_line.split()[0]
-                                            
-                                            # Check if the first word looks like an exception class name
-                                            # Exception class names typically contain dots and end with Exception/Error
-                                            if '.' in first_word and (first_word.endswith('Exception') or first_word.endswith('Error')):
-                                                # Special case: AssertionError is an assertion error, not a runtime error
-                                                if first_word.endswith('AssertionError'):
-                                                    # Always check the next two lines for a runtime exception caused by AssertionError
-                                                    for offset in [1, 2]:
-                                                        if i + offset < len(lines):
-                                                            possible_caused_by = lines[i + offset].strip()
-                                                            if possible_caused_by.startswith('Caused by:') and any(runtime_exc in possible_caused_by for runtime_exc in ['NullPointerException', 'IllegalArgumentException', 'RuntimeException', 'ParseException', 'MissingMethodInvocationException']):
-                                                                failure_type = "runtime_error"
-                                                                break
-                                                    # If no runtime exception found, keep as assertion_error
-                                                else:
-                                                    failure_type = "runtime_error"
-                                    
-                                    failing_tests[test_name] = failure_type
-                        
-                        # For each known test method, determine if it passed or failed in this iteration
-                        for method_name in test_methods_for_group:
-                            if method_name in failing_tests:
-                                # This test was explicitly reported as failed
-                                failure_type = failing_tests[method_name]
-                                iteration_results[method_name] = False
-                                # Update the failure tracking for this iteration
-                                group_failures[method_name] = failure_type
-                            else:
-                                # This test was not reported as failed, so it must have passed
-                                iteration_results[method_name] = True
-                                if method_name not in group_failures:
-                                    group_failures[method_name] = None  # None means passed
-                        
-                        # Store the actual Gradle counts for later use
-                        iteration_results['_gradle_total'] = total_tests
-                        iteration_results['_gradle_failures'] = failed_tests_count
-                        iteration_results['_gradle_passed'] = passed_tests_count
-                        
-                        # Print clean summary for this iteration
+                # Print clean summary for this iteration
+                if iteration_summary:
+                    total_tests, passed_tests_count, failed_tests_count, show_error_breakdown = iteration_summary
+                    error_info = ""
+                    if show_error_breakdown:
                         error_counts = count_error_types(group_failures, test_methods_for_group)
                         error_breakdown = []
                         if error_counts["assertion_error"] > 0:
@@ -1072,15 +2403,8 @@ def run_test_class(
                             error_breakdown.append(f"{error_counts['timeout']} timeout")
                         
                         error_info = f" ({', '.join(error_breakdown)})" if error_breakdown else ""
-                        print(f"   {summary(f'{total_tests} total, {passed_tests_count} passed, {failed_tests_count} failed')}{error_info}")
-                        print()
-                    else:
-                        # Gradle pattern not found - assume all tests passed
-                        total_tests = len(test_methods_for_group)
-                        passed_tests_count = total_tests
-                        failed_tests_count = 0
-                        print(f"   {summary(f'{total_tests} total, {passed_tests_count} passed, {failed_tests_count} failed')}")
-                        print()
+                    print(f"   {summary(f'{total_tests} total, {passed_tests_count} passed, {failed_tests_count} failed')}{error_info}")
+                    print()
                 
                 group_test_results.append(iteration_results)
                 
@@ -1098,10 +2422,29 @@ def run_test_class(
                 for method_name in test_methods_for_group:
                     group_failures[method_name] = "runtime_error"
                 group_test_results.append(iteration_results)
+            
+            iterations_run += 1
+            
+            # Once the outcomes settle, further iterations are unlikely to reveal a flaky test
+            outcomes = {method_name: group_test_results[-1].get(method_name) for method_name in test_methods_for_group}
+            if iterations_run >= _MIN_GROUP_ITERATIONS and outcomes == previous_outcomes:
+                if iterations_run < 5:
+                    print(f"{info(f'Group results unchanged for two iterations, skipping the remaining {5 - iterations_run}')}")
+                break
+            previous_outcomes = outcomes
+        
+        if group_executor:
+            # Iterations that have not started yet are no longer needed
+            group_executor.shutdown(wait=True, cancel_futures=True)
+        if group_executor or shard_copies:
+            remove_worker_copies(repo_path)
         
         # Create detailed group summary with build system totals
         group_summary = create_detailed_summary(group_failures, test_methods_for_group, "Group", json_logger, bug_revealing_runtime_errors_count, fixable_runtime_errors_count, total_runtime_errors_count, total_rfl_attempts_count, total_tests_fixed_count)
         print(group_summary)
+        print(f"   Iterations run: {iterations_run}/5")
+        if json_logger:
+            json_logger.update_field("test_execution.group.iterations_run", iterations_run)
         
         return individual_results, individual_failures, group_failures, bug_revealing_runtime_errors_count, fixable_runtime_errors_count, total_runtime_errors_count, total_rfl_attempts_count, total_tests_fixed_count
     
@@ -1128,42 +2471,20 @@ def run_all_tests(
     """
     try:
         if build_system == "gradle":
-            gradle_wrapper = repo_path / "gradlew"
-            if gradle_wrapper.exists():
-                gradle_wrapper.chmod(0o755)
-                cmd = [str(gradle_wrapper), "test"]
-            else:
-                cmd = ["gradle", "test"]
+            cmd = gradle_command_prefix(repo_path) + ["test"]
                 
         elif build_system == "maven":
-            cmd = ["mvn", "test", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
+            await_daemon_warmup(repo_path)
+            cmd = [maven_executable(), "test", "-Dspotless.check.skip=true", "-Dcheckstyle.skip=true", "-Dpmd.skip=true", "-Dfindbugs.skip=true", "-Dspring-javaformat.skip=true", "-Dsortpom.skip=true", "-Denforcer.skip=true"]
         else:
             raise ValueError(f"Unsupported build system: {build_system}")
         
-        # Set environment variables
-        env = os.environ.copy()
-        # Get Java version and path from global config (like compile_java_file.py does)
-        java_version = test_config.get_java_version()
-        java_path = test_config.get_java_path()
-        
-        if java_path:
-            env['JAVA_HOME'] = java_path
-            env['PATH'] = f"{java_path}/bin:{env['PATH']}"
-            if build_system == "gradle":
-                env['GRADLE_OPTS'] = f"-Dorg.gradle.java.home={java_path}"
-        
-        # Run all tests
-        result = subprocess.run(
-            cmd,
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            env=env
-        )
+        # Set environment variables (built once per Java path and reused)
+        env = _test_env(build_system, test_config.get_java_path())
         
-        output = result.stdout + "\n" + result.stderr
-        success = result.returncode == 0
+        # Run all tests, streaming the output so only its tail is held in memory
+        returncode, output = _run_streaming(cmd, repo_path, env, timeout)
+        success = returncode == 0
         
         return success, output
         
@@ -1218,6 +2539,195 @@ def execute_and_filter_tests(
     # Return empty list since this function is not used in the new flow
     return []
 
+@functools.lru_cache(maxsize=8)
+def _parsed_test_methods(test_content: str) -> Optional[Tuple[List[str], Dict[str, Tuple[int, int]]]]:
+    """
+    Parse a test class once and index the line range of each method it declares.
+    
+    Every test method of a class is extracted from the same content, so the parse
+    is shared by all of them.
+    
+    Args:
+        test_content: The full test class content
+        
+    Returns:
+        Tuple of (source lines, {method name: (signature line index, last line index)})
+        for the first declaration of each name, or None if tree-sitter is unavailable
+        or the content does not parse cleanly
+    """
+    if _JAVA_LANGUAGE is None:
+        return None
+    tree = Parser(_JAVA_LANGUAGE).parse(test_content.encode('utf-8'))
+    if tree.root_node.has_error:
+        return None
+    
+    method_ranges = {}
+    # Walk the tree in document order (nested classes included)
+    stack = [tree.root_node]
+    while stack:
+        node = stack.pop()
+        if node.type == 'method_declaration':
+            name_node = node.child_by_field_name('name')
+            if name_node is not None:
+                method_ranges.setdefault(name_node.text.decode('utf-8'), (name_node.start_point[0], node.end_point[0]))
+        stack.extend(reversed(node.children))
+    return test_content.split('\n'), method_ranges
+
+def extract_test_method_lines(test_content: str, method_name: str) -> List[str]:
+    """
+    Extract the lines of a single test method (including its @Test annotation).
+    
+    Args:
+        test_content: The full test class content OR the individual test method content
+        method_name: The name of the test method to isolate
+        
+    Returns:
+        List of source lines of the test method
+    """
+    # Check if test_content is a full test class or just a single test method
+    if '@Test' in test_content and 'public void' in test_content and not _JAVA_CLASS_DECLARATION_RE.search(test_content):
+        # This is a single test method content
+        return test_content.split('\n')
+    
+    # This is a full test class content - look the method up in the parsed class
+    signature_pattern = _test_method_signature_pattern(method_name)
+    parsed_methods = _parsed_test_methods(test_content)
+    if parsed_methods is not None:
+        lines, method_ranges = parsed_methods
+        method_range = method_ranges.get(method_name)
+        if method_range is not None and signature_pattern.search(lines[method_range[0]]):
+            signature_row, last_row = method_range
+            # Include the @Test annotation if it is on the previous line
+            first_row = signature_row - 1 if signature_row > 0 and '@Test' in lines[signature_row - 1] else signature_row
+            return lines[first_row:last_row + 1]
+    
+    # Otherwise locate the method signature directly in the text
+    signature = signature_pattern.search(test_content)
+    if signature is None:
+        return []
+    
+    method_lines = []
+    line_start = test_content.rfind('\n', 0, signature.start()) + 1
+    
+    # Check if there's a @Test annotation on the previous line
+    if line_start > 0:
+        previous_line = test_content[test_content.rfind('\n', 0, line_start - 1) + 1:line_start - 1]
+        if '@Test' in previous_line:
+            method_lines.append(previous_line)
+    
+    # Walk the method line by line from its signature (the rest of the content is never
+    # split) until the braces of its body balance, or a body-less declaration ends; this
+    # gives the same lines as the method_declaration node of the tree-sitter path
+    brace_count = 0
+    body_opened = False
+    while True:
+        line_end = test_content.find('\n', line_start)
+        line = test_content[line_start:] if line_end == -1 else test_content[line_start:line_end]
+        method_lines.append(line)
+        code = _JAVA_NON_CODE_RE.sub('', line) if '"' in line or "'" in line or '//' in line else line
+        brace_count += code.count('{') - code.count('}')
+        body_opened = body_opened or '{' in code
+        if line_end == -1 or (brace_count == 0 and (body_opened or code.rstrip().endswith(';'))):
+            # Method is complete (or the content ended first)
+            break
+        line_start = line_end + 1
+    
+    return method_lines
+
+def scaffold_method_block(method_lines: List[str]) -> str:
+    """
+    Indent a test method's lines for insertion before a scaffold's closing brace.
+    
+    Args:
+        method_lines: Source lines of the test method
+        
+    Returns:
+        The block to insert, with a leading and trailing newline
+    """
+    # Add the test method with proper indentation
+    test_methods_block = []
+    for line in method_lines:
+        if line.strip():
+            test_methods_block.append("    " + line)
+        else:
+            test_methods_block.append("")
+    _strip_block_end(test_methods_block)
+    
+    return "\n" + "\n".join(test_methods_block) + "\n"
+
+def _strip_block_end(block_lines: List[str]) -> None:
+    """
+    Drop trailing blank lines and trailing whitespace from a block of lines, in place.
+    
+    Same result as "\n".join(block_lines).rstrip(), without joining and copying the
+    whole block first; every line is either empty or starts with indentation and text.
+    """
+    while block_lines and not block_lines[-1]:
+        block_lines.pop()
+    if block_lines:
+        block_lines[-1] = block_lines[-1].rstrip()
+
+@functools.lru_cache(maxsize=8)
+def _scaffold_parts(scaffold: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a scaffold at its closing brace, once per scaffold.
+    
+    The scaffold is the same for every test method of a class, so the cache (keyed
+    by the scaffold text itself) saves the rfind and slicing for all but the first.
+    
+    Args:
+        scaffold: The test scaffold
+        
+    Returns:
+        Tuple of (prefix, suffix), or None if the scaffold has no closing brace
+    """
+    last_brace_index = scaffold.rfind("}")
+    if last_brace_index == -1:
+        return None
+    return scaffold[:last_brace_index], scaffold[last_brace_index:]
+
+@functools.lru_cache(maxsize=8)
+def _encoded_scaffold_parts(scaffold: str) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Split a scaffold at its closing brace and UTF-8 encode both halves, once per scaffold.
+    
+    Args:
+        scaffold: The test scaffold
+        
+    Returns:
+        Tuple of (prefix_bytes, suffix_bytes), or None if the scaffold has no closing brace
+    """
+    scaffold_parts = _scaffold_parts(scaffold)
+    if scaffold_parts is None:
+        return None
+    prefix, suffix = scaffold_parts
+    return prefix.encode('utf-8'), suffix.encode('utf-8')
+
+def create_isolated_test_bytes(test_content: str, method_name: str, class_name: str, package: str, scaffold: str = None) -> bytes:
+    """
+    Same as create_isolated_test_with_scaffold, but returns the UTF-8 encoded file content.
+    
+    The scaffold around the method is encoded once and reused for every test method,
+    so only the method itself is encoded per call.
+    
+    Args:
+        test_content: The full test class content OR the individual test method content
+        method_name: The name of the test method to isolate
+        class_name: The test class name
+        package: The package name
+        scaffold: The test scaffold to use (optional)
+        
+    Returns:
+        The encoded content of the isolated test file
+    """
+    scaffold_parts = _encoded_scaffold_parts(scaffold) if scaffold else None
+    if scaffold_parts is None:
+        return create_isolated_test_with_scaffold(test_content, method_name, class_name, package, scaffold).encode('utf-8')
+    
+    prefix_bytes, suffix_bytes = scaffold_parts
+    method_block = scaffold_method_block(extract_test_method_lines(test_content, method_name))
+    return prefix_bytes + method_block.encode('utf-8') + suffix_bytes
+
 def create_isolated_test_with_scaffold(test_content: str, method_name: str, class_name: str, package: str, scaffold: str = None) -> str:
     """
     Create an isolated test file containing the scaffold and the specified test method.
@@ -1232,93 +2742,17 @@ def create_isolated_test_with_scaffold(test_content: str, method_name: str, clas
     Returns:
         The content of the isolated test file
     """
-    import re
-    
-    # Check if test_content is a full test class or just a single test method
-    if '@Test' in test_content and 'public void' in test_content and 'class' not in test_content:
-        # This is a single test method content
-        method_lines = test_content.split('\n')
-    else:
-        # This is a full test class content - extract the specific method
-        # Extract the specific test method from the full test content
-        # Look for the method signature first
-        method_pattern = re.compile(rf'public\s+void\s+{re.escape(method_name)}\s*\(')
-        
-        method_lines = []
-        in_method = False
-        brace_count = 0
-        lines = test_content.split('\n')
-        
-        for i, line in enumerate(lines):
-            if method_pattern.search(line):
-                # Found the start of our method
-                in_method = True
-                
-                # Check if there's a @Test annotation on the previous line
-                if i > 0 and '@Test' in lines[i-1]:
-                    method_lines.append(lines[i-1])  # Add the @Test line
-                
-                method_lines.append(line)  # Add the method signature line
-                brace_count = line.count('{') - line.count('}')
-            elif in_method:
-                method_lines.append(line)
-                brace_count += line.count('{') - line.count('}')
-                if brace_count == 0:
-                    # Method is complete
-                    break
-        
-        if not method_lines:
-            # Fallback: try to find the method using a simpler approach
-            method_start = test_content.find(f'public void {method_name}(')
-            if method_start != -1:
-                # Find the opening brace
-                brace_start = test_content.find('{', method_start)
-                if brace_start != -1:
-                    # Count braces to find the end
-                    brace_count = 1
-                    pos = brace_start + 1
-                    while pos < len(test_content) and brace_count > 0:
-                        if test_content[pos] == '{':
-                            brace_count += 1
-                        elif test_content[pos] == '}':
-                            brace_count -= 1
-                        pos += 1
-                    
-                    method_content = test_content[method_start:pos]
-                    method_lines = method_content.split('\n')
-                    
-                    # Add @Test if it's missing
-                    if not any('@Test' in line for line in method_lines):
-                        for i, line in enumerate(method_lines):
-                            if line.strip().startswith('public void'):
-                                method_lines[i] = '    @Test' + line
-                                break
+    method_lines = extract_test_method_lines(test_content, method_name)
     
     if scaffold:
-        # Use the provided scaffold
-        assembled_test_file = scaffold
+        # Use the provided scaffold, split at its closing brace once per scaffold
+        scaffold_parts = _scaffold_parts(scaffold)
+        if scaffold_parts is None:
+            return scaffold
         
         # Insert the single test method before the closing brace
-        last_brace_index = assembled_test_file.rfind("}")
-        if last_brace_index != -1:
-            # Build the test methods block
-            test_methods_block = []
-            # Add the test method with proper indentation
-            for line in method_lines:
-                if line.strip():
-                    test_methods_block.append("    " + line)
-                else:
-                    test_methods_block.append("")
-            
-            # Insert the test method before the closing brace
-            assembled_test_file = (
-                assembled_test_file[:last_brace_index] +
-                "\n" +
-                "\n".join(test_methods_block).rstrip() + "\n" +
-                assembled_test_file[last_brace_index:]
-            )
-        
-        return assembled_test_file
+        prefix, suffix = scaffold_parts
+        return "".join((prefix, scaffold_method_block(method_lines), suffix))
     else:
         # Fallback to basic scaffold
         scaffold_lines = [
@@ -1344,6 +2778,64 @@ def create_isolated_test_with_scaffold(test_content: str, method_name: str, clas
         
         return "\n".join(scaffold_lines)
 
+def classify_gradle_test_failure(exception_line: Optional[str], following_line: Optional[str]) -> str:
+    """
+    Categorize a Gradle "ClassName > methodName FAILED" entry from the lines printed after it.
+    
+    Args:
+        exception_line: Line after the FAILED line, e.g. "    java.lang.NullPointerException at FooTest.java:12"
+        following_line: The line after that, which may hold "Caused by: ..."
+        
+    Returns:
+        Failure category: "assertion_error" or "runtime_error"
+    """
+    # Runtime error format: indented line starting with exception class name
+    # Pattern: "    org.package.ExceptionName at File.java:line"
+    if not exception_line or not exception_line.startswith('    ') or not exception_line.split():
+        return "assertion_error"
+    first_word = exception_line.split()[0]
+    
+    # Exception class names typically contain dots and end with Exception/Error
+    if '.' not in first_word or not first_word.endswith(('Exception', 'Error')):
+        return "assertion_error"
+    if not first_word.endswith('AssertionError'):
+        return "runtime_error"
+    
+    # An AssertionError caused by a runtime exception is a runtime error
+    for line in (exception_line, following_line or ""):
+        line = line.strip()
+        if line.startswith('Caused by:') and any(runtime_exc in line for runtime_exc in _RUNTIME_CAUSE_EXCEPTIONS):
+            return "runtime_error"
+    return "assertion_error"
+
+def categorize_junit_failure(build_system: str, status: str, exception_type: str, details: str) -> str:
+    """
+    Categorize a failed test case from a JUnit XML report, using the same rules as the console parsers.
+    
+    Args:
+        build_system: Build system type ("gradle" or "maven")
+        status: "failure" or "error" (the element reported for the test case)
+        exception_type: Exception class from the element's type attribute
+        details: Stack trace text of the element
+        
+    Returns:
+        Failure category: "assertion_error" or "runtime_error"
+    """
+    if build_system == "maven":
+        # Surefire reports assertion failures as <failure> and other exceptions as <error>
+        return "runtime_error" if status == "error" else "assertion_error"
+    
+    # Gradle reports every exception as <failure>, so look at the exception class
+    if '.' in exception_type and exception_type.endswith(('Exception', 'Error')):
+        if not exception_type.endswith('AssertionError'):
+            return "runtime_error"
+        # An AssertionError caused by a runtime exception is a runtime error
+        for line in details.splitlines():
+            line = line.strip()
+            if line.startswith('Caused by:') and any(runtime_exc in line for runtime_exc in _RUNTIME_CAUSE_EXCEPTIONS):
+                return "runtime_error"
+    return "assertion_error"
+
 def categorize_test_failure(test_output: str, build_system: str) -> str:
     """
     Categorize test failure based on build system output.
@@ -1355,18 +2847,21 @@ def categorize_test_failure(test_output: str, build_system: str) -> str:
     Returns:
         Failure category: "assertion_error" (FAILURES) or "runtime_error" (ERRORS)
     """
-    output_lower = test_output.lower()
+    if build_system == "gradle":
+        # Gradle console output is not classified: a failing run counts as an assertion
+        # error (runs with a JUnit XML report are classified by categorize_junit_failure)
+        return "assertion_error"
     
     if build_system == "maven":
         # Maven reports "FAILURES" for assertion failures and "ERRORS" for runtime exceptions
-        lines = test_output.split('\n')
-        for line in lines:
+        # (the scan only visits the lines that hold a count, and lowercases just those)
+        for line in _MAVEN_COUNT_LINE_RE.findall(test_output):
+            line = line.lower()
             # Look for Maven summary line: "Tests run: X, Failures: Y, Errors: Z"
-            if "failures:" in line.lower() and "errors:" in line.lower():
-                import re
+            if "failures:" in line and "errors:" in line:
                 # Extract both failures and errors from the same line
-                failures_match = re.search(r'failures:\s*(\d+)', line.lower())
-                errors_match = re.search(r'errors:\s*(\d+)', line.lower())
+                failures_match = _MAVEN_FAILURES_COUNT_RE.search(line)
+                errors_match = _MAVEN_ERRORS_COUNT_RE.search(line)
                 
                 if failures_match and errors_match:
                     failures_count = int(failures_match.group(1))
@@ -1378,71 +2873,21 @@ def categorize_test_failure(test_output: str, build_system: str) -> str:
                     elif failures_count > 0:
                         return "assertion_error"
             
-            # Fallback: check individual patterns if not found together
-            elif "failures:" in line.lower() and any(char.isdigit() for char in line):
-                import re
-                match = re.search(r'failures:\s*(\d+)', line.lower())
+            # Fallback: check individual patterns if not found together (a count match
+            # already implies the line holds a digit)
+            elif "failures:" in line:
+                match = _MAVEN_FAILURES_COUNT_RE.search(line)
                 if match and int(match.group(1)) > 0:
                     return "assertion_error"
-            elif "errors:" in line.lower() and any(char.isdigit() for char in line):
-                import re
-                match = re.search(r'errors:\s*(\d+)', line.lower())
+            elif "errors:" in line:
+                match = _MAVEN_ERRORS_COUNT_RE.search(line)
                 if match and int(match.group(1)) > 0:
                     return "runtime_error"
     
-    elif build_system == "gradle":
-        # For Gradle, we need to parse the output format to determine failure type
-        # Gradle output format for test failures:
-        # com.fishercoder.solutions._235Test > recursiveCallToLeftSubtree FAILED
-        #     org.mockito.exceptions.misusing.MissingMethodInvocationException at _235Test.java:19
-        # OR
-        # com.fishercoder.solutions._235Test > testLowestCommonAncestorWhenBothPSmallerThanRoot FAILED
-        #     java.lang.AssertionError at _235Test.java:21
-        
-        lines = test_output.split('\n')
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for Gradle test failure pattern: "ClassName > methodName FAILED"
-            if ' > ' in line and ' FAILED' in line:
-                # This is a test failure line, check the next line for exception details
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    original_next_line = lines[i + 1]  # Keep original for indentation check
-                    
-                    # Runtime error format: indented line starting with exception class name
-                    # Pattern: "    org.package.ExceptionName at File.java:line"
-                    if original_next_line.startswith('    ') and len(next_line.split()) > 0:
-                        first_word = next_line.split()[0]
-                        
-                        # Check if the first word looks like an exception class name
-                        # Exception class names typically contain dots and end with Exception/Error
-                        if '.' in first_word and (first_word.endswith('Exception') or first_word.endswith('Error')):
-                            # Special case: AssertionError is an assertion error, not a runtime error
-                            if first_word.endswith('AssertionError'):
-                                # Always check the next two lines for a runtime exception caused by AssertionError
-                                for offset in [1, 2]:
-                                    if i + offset < len(lines):
-                                        possible_caused_by = lines[i + offset].strip()
-                                        if possible_caused_by.startswith('Caused by:') and any(runtime_exc in possible_caused_by for runtime_exc in ['NullPointerException', 'IllegalArgumentException', 'RuntimeException', 'ParseException', 'MissingMethodInvocationException']):
-                                            failure_type = "runtime_error"
-                                            break
-                                # If no runtime exception found, keep as assertion_error
-                            else:
-                                failure_type = "runtime_error"
-                    
-                    # If we don't find the runtime error format, it's an assertion error
-                    return "assertion_error"
-                else:
-                    return "assertion_error"
-        
-        # Fallback: if we can't determine from format, default to assertion error
-        return "assertion_error"
-    
     # Fallback: check for specific patterns if build system specific parsing didn't work
-    if "assertionerror" in output_lower or "expected:" in output_lower or "but was:" in output_lower:
+    if _ASSERTION_MARKER_RE.search(test_output):
         return "assertion_error"
-    elif any(exc in output_lower for exc in ["nullpointerexception", "illegalargumentexception", "runtimeexception", "parseexception", "missingmethodinvocationexception"]):
+    elif _RUNTIME_EXCEPTION_MARKER_RE.search(test_output):
         return "runtime_error"
     
     # Default to assertion error if we can't determine
@@ -1724,6 +3169,49 @@ def is_thrown_by_method_under_test(
     
     return False
 
+@dataclass
+class ExecutionReport:
+    """Pass/fail tallies of a test run, built once by build_execution_report."""
+    
+    total_tests: int = 0
+    passed_tests: int = 0
+    # Failure category of each failed method, in test method order
+    failures: Dict[str, str] = field(default_factory=dict)
+    # Number of failed methods per known failure category
+    failure_counts: Dict[str, int] = field(default_factory=lambda: {
+        "assertion_error": 0,
+        "runtime_error": 0,
+        "bug_revealing_runtime_error": 0,  # NEW: JCrasher classification
+        "timeout": 0
+    })
+    
+    @property
+    def failed_tests(self) -> int:
+        """Number of failed test methods."""
+        return self.total_tests - self.passed_tests
+
+def build_execution_report(failure_details: Dict[str, str], test_methods: List[str]) -> ExecutionReport:
+    """
+    Tally test results from failure details.
+    
+    Args:
+        failure_details: Dictionary mapping test method names to failure categories
+        test_methods: List of all test method names
+        
+    Returns:
+        ExecutionReport with totals, per-category counts and the failed methods
+    """
+    # Infer pass/fail status from failure_details (None means passed)
+    failures = {method: failure_details[method] for method in test_methods if failure_details.get(method) is not None}
+    report = ExecutionReport(total_tests=len(test_methods), passed_tests=len(test_methods) - len(failures), failures=failures)
+    
+    # Tally the categories in one Counter pass over the failed methods only
+    category_counts = collections.Counter(failures.values())
+    for failure_type in report.failure_counts:
+        report.failure_counts[failure_type] = category_counts[failure_type]
+    
+    return report
+
 def create_detailed_summary(failure_details: Dict[str, str], test_methods: List[str], summary_type: str, json_logger=None, bug_revealing_runtime_errors_count=0, fixable_runtime_errors_count=0, total_runtime_errors_count=0, total_rfl_attempts_count=0, total_tests_fixed_count=0) -> str:
     """
     Create a detailed summary of test execution results.
@@ -1737,24 +3225,11 @@ def create_detailed_summary(failure_details: Dict[str, str], test_methods: List[
     Returns:
         Formatted summary string
     """
-    total_tests = len(test_methods)
-    # Infer pass/fail status from failure_details
-    passed_tests = sum(1 for method in test_methods if failure_details.get(method) is None)
-    failed_tests = total_tests - passed_tests
-    
-    # Count failure types
-    failure_counts = {
-        "assertion_error": 0,
-        "runtime_error": 0,
-        "bug_revealing_runtime_error": 0,  # NEW: JCrasher classification
-        "timeout": 0
-    }
-    
-    for method in test_methods:
-        failure_type = failure_details.get(method)
-        if failure_type is not None:  # If test failed (has a failure type)
-            if failure_type in failure_counts:
-                failure_counts[failure_type] += 1
+    report = build_execution_report(failure_details, test_methods)
+    total_tests = report.total_tests
+    passed_tests = report.passed_tests
+    failed_tests = report.failed_tests
+    failure_counts = report.failure_counts
     
     # Calculate total runtime errors (fixable + bug-revealing)
     total_runtime_errors = failure_counts["runtime_error"] + failure_counts["bug_revealing_runtime_error"]
@@ -1769,17 +3244,15 @@ def create_detailed_summary(failure_details: Dict[str, str], test_methods: List[
         # Convert failure_details to the format expected by JSON logger
         # Map failure types to readable names
         failures_dict = {}
-        for method in test_methods:
-            failure_type = failure_details.get(method)
-            if failure_type is not None:  # If test failed
-                if failure_type == "assertion_error":
-                    failures_dict[method] = "Assertion Error"
-                elif failure_type == "runtime_error":
-                    failures_dict[method] = "Runtime Error"
-                elif failure_type == "bug_revealing_runtime_error":
-                    failures_dict[method] = "Runtime Error"  # Generic runtime error
-                elif failure_type == "timeout":
-                    failures_dict[method] = "Timeout"
+        for method, failure_type in report.failures.items():
+            if failure_type == "assertion_error":
+                failures_dict[method] = "Assertion Error"
+            elif failure_type == "runtime_error":
+                failures_dict[method] = "Runtime Error"
+            elif failure_type == "bug_revealing_runtime_error":
+                failures_dict[method] = "Runtime Error"  # Generic runtime error
+            elif failure_type == "timeout":
+                failures_dict[method] = "Timeout"
         
         if summary_type == "Individual":
             json_logger.update_test_execution_individual(
@@ -1828,11 +3301,9 @@ def create_detailed_summary(failure_details: Dict[str, str], test_methods: List[
     # Add detailed failure information with renamed section
     if failed_tests > 0:
         summary_lines.append(f"\n   {info('Failure Breakdown:')}")
-        for method in test_methods:
-            failure_type = failure_details.get(method)
-            if failure_type is not None:  # If test failed
-                readable_type = failure_type.replace("_", " ").title()
-                summary_lines.append(f"      • {method}: {readable_type}")
+        for method, failure_type in report.failures.items():
+            readable_type = failure_type.replace("_", " ").title()
+            summary_lines.append(f"      • {method}: {readable_type}")
     
     return "\n".join(summary_lines)
 
@@ -1853,6 +3324,7 @@ def create_filtered_test_content(test_content: str, timeout_tests: List[str], cl
     
     print(f"   Filtering out {len(timeout_tests)} timeout tests: {timeout_tests}")
     
+    timeout_set = set(timeout_tests)
     lines = test_content.split('\n')
     filtered_lines = []
     skip_method = False
@@ -1860,32 +3332,24 @@ def create_filtered_test_content(test_content: str, timeout_tests: List[str], cl
     in_method = False
     
     for i, line in enumerate(lines):
-        # Check if this line starts a timeout test method
-        for timeout_test in timeout_tests:
-            # Look for @Test annotation followed by the method
-            if '@Test' in line and f'public void {timeout_test}(' in lines[i + 1] if i + 1 < len(lines) else False:
-                skip_method = True
-                print(f"     Skipping timeout test: {timeout_test}")
-                break
-            # Also check if method starts on the same line as @Test
-            elif '@Test' in line and f'public void {timeout_test}(' in line:
+        # Check if this line starts a timeout test method: the method may start on the
+        # same line as @Test or on the line after it
+        if not skip_method and '@Test' in line:
+            signature = _METHOD_DECL_RE.search(line)
+            if signature is None and i + 1 < len(lines):
+                signature = _METHOD_DECL_RE.search(lines[i + 1])
+            if signature is not None and signature.group(1) in timeout_set:
                 skip_method = True
-                print(f"     Skipping timeout test: {timeout_test}")
-                break
-        
-        if skip_method:
-            # Skip this line and start counting braces
-            if '{' in line:
-                brace_count = line.count('{') - line.count('}')
-                if brace_count == 0:
-                    # Method ends on the same line
-                    skip_method = False
-            continue
+                brace_count = 0
+                in_method = False
+                print(f"     Skipping timeout test: {signature.group(1)}")
         
-        # If we're in a method we're skipping, count braces
         if skip_method:
+            # Skip this line and count braces until the method body closes
             brace_count += line.count('{') - line.count('}')
-            if brace_count == 0:
+            if '{' in line:
+                in_method = True
+            if in_method and brace_count <= 0:
                 # Method is complete, stop skipping
                 skip_method = False
             continue
@@ -1906,19 +3370,51 @@ def count_error_types(failure_details: Dict[str, str], test_methods: List[str])
     Returns:
         Dictionary with counts for each error type
     """
-    error_counts = {
-        "assertion_error": 0,
-        "runtime_error": 0,
-        "bug_revealing_runtime_error": 0,  # NEW: JCrasher classification
-        "timeout": 0
-    }
-    
-    for method in test_methods:
-        failure_type = failure_details.get(method)
-        if failure_type in error_counts:
-            error_counts[failure_type] += 1
+    return build_execution_report(failure_details, test_methods).failure_counts 
+
+def _assemble_test_content_from_tuples(tests: List[Tuple], class_name: str, scaffold: Optional[str]) -> str:
+    """
+    Assemble a test class from (scenario, test_method) tuples, joining every piece once.
     
-    return error_counts 
+    Args:
+        tests: List of (scenario, test_method) tuples
+        class_name: Name of the test class (used without a scaffold)
+        scaffold: The test scaffold to insert the methods into (optional)
+        
+    Returns:
+        Assembled test content string
+    """
+    if scaffold:
+        # Insert all test methods before the scaffold's closing brace
+        last_brace_index = scaffold.rfind("}")
+        if last_brace_index == -1:
+            return scaffold
+        
+        # Build the test methods block
+        test_methods_block = []
+        for idx, (scenario, test_method) in enumerate(tests, 1):
+            test_methods_block.append(f"    // Test {idx}: {scenario.title}")
+            test_methods_block.append(f"    // {scenario.description}")
+            # Add the test method with proper indentation
+            test_methods_block.extend(("    " + line) if line.strip() else "" for line in test_method.splitlines())
+            test_methods_block.append("")  # Add blank line between methods
+        _strip_block_end(test_methods_block)
+        
+        return "".join((
+            scaffold[:last_brace_index],
+            "\n",
+            "\n".join(test_methods_block),
+            "\n",
+            scaffold[last_brace_index:]
+        ))
+    
+    # Fallback to basic structure
+    parts = [f"public class {class_name} {{\n"]
+    for scenario, test_method in tests:
+        parts.append(f"    // {scenario.title}\n")
+        parts.append(f"    {test_method}\n\n")
+    parts.append("}")
+    return "".join(parts)
 
 def create_test_content_from_tuples(final_tests: List[Tuple], class_name: str, scaffold: str = None) -> str:
     """
@@ -1932,43 +3428,7 @@ def create_test_content_from_tuples(final_tests: List[Tuple], class_name: str, s
     Returns:
         Assembled test content string
     """
-    if scaffold:
-        # Use the provided scaffold
-        assembled_test_file = scaffold
-        
-        # Insert all test methods before the closing brace
-        last_brace_index = assembled_test_file.rfind("}")
-        if last_brace_index != -1:
-            # Build the test methods block
-            test_methods_block = []
-            for idx, (scenario, test_method) in enumerate(final_tests, 1):
-                test_methods_block.append(f"    // Test {idx}: {scenario.title}")
-                test_methods_block.append(f"    // {scenario.description}")
-                # Add the test method with proper indentation
-                for line in test_method.splitlines():
-                    if line.strip():
-                        test_methods_block.append("    " + line)
-                    else:
-                        test_methods_block.append("")
-                test_methods_block.append("")  # Add blank line between methods
-            
-            # Insert the test methods before the closing brace
-            assembled_test_file = (
-                assembled_test_file[:last_brace_index] +
-                "\n" +
-                "\n".join(test_methods_block).rstrip() + "\n" +
-                assembled_test_file[last_brace_index:]
-            )
-        
-        return assembled_test_file
-    else:
-        # Fallback to basic structure
-        test_content = f"public class {class_name} {{\n"
-        for scenario, test_method in final_tests:
-            test_content += f"    // {scenario.title}\n"
-            test_content += f"    {test_method}\n\n"
-        test_content += "}"
-        return test_content
+    return _assemble_test_content_from_tuples(final_tests, class_name, scaffold)
 
 def create_filtered_test_content_from_tuples(passing_tests: List[Tuple], timeout_tests: List[str], class_name: str, scaffold: str = None) -> str:
     """
@@ -1983,40 +3443,4 @@ def create_filtered_test_content_from_tuples(passing_tests: List[Tuple], timeout
     Returns:
         Filtered test content string
     """
-    if scaffold:
-        # Use the provided scaffold
-        assembled_test_file = scaffold
-        
-        # Insert all passing test methods before the closing brace
-        last_brace_index = assembled_test_file.rfind("}")
-        if last_brace_index != -1:
-            # Build the test methods block
-            test_methods_block = []
-            for idx, (scenario, test_method) in enumerate(passing_tests, 1):
-                test_methods_block.append(f"    // Test {idx}: {scenario.title}")
-                test_methods_block.append(f"    // {scenario.description}")
-                # Add the test method with proper indentation
-                for line in test_method.splitlines():
-                    if line.strip():
-                        test_methods_block.append("    " + line)
-                    else:
-                        test_methods_block.append("")
-                test_methods_block.append("")  # Add blank line between methods
-            
-            # Insert the test methods before the closing brace
-            assembled_test_file = (
-                assembled_test_file[:last_brace_index] +
-                "\n" +
-                "\n".join(test_methods_block).rstrip() + "\n" +
-                assembled_test_file[last_brace_index:]
-            )
-        
-        return assembled_test_file
-    else:
-        # Fallback to basic structure
-        test_content = f"public class {class_name} {{\n"
-        for scenario, test_method in passing_tests:
-            test_content += f"    // {scenario.title}\n"
-            test_content += f"    {test_method}\n\n"
-        test_content += "}"
-        return test_content 
\ No newline at end of file
+    return _assemble_test_content_from_tuples(passing_tests, class_name, scaffold) 
\ No newline at end of file
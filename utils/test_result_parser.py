@@ -1,5 +1,56 @@
 import re
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+# Gradle per-test result line: "com.fishercoder.solutions._235Test > testNodesAreEqual FAILED"
+# (a match always starts a word, so \b spares the engine retrying \w+ inside every word)
+_GRADLE_TEST_RE = re.compile(r'\b(\w+Test)\s*>\s*(\w+)\s+(PASSED|FAILED)')
+# Gradle summary line: "X tests completed, Y failed"
+_GRADLE_SUMMARY_RE = re.compile(r'(\d+) tests? completed, (\d+) failed')
+# Gradle check-mark result line: "✓ testMethodName" or "✗ testMethodName"
+_CHECK_MARK_RE = re.compile(r'([✓✗])\s+(\w+)')
+# Maven summary line: "Tests run: 5, Failures: 0, Errors: 0, Skipped: 0"
+_MAVEN_SUMMARY_RE = re.compile(r'Tests run: (\d+), Failures: (\d+), Errors: (\d+)')
+# Maven test class start line: "Running com.example.FooTest"
+_MAVEN_RUNNING_RE = re.compile(r'Running (\w+)')
+# @Test annotated declaration, with the annotation on the same line or the line above,
+# or as @Test(...) on the line above ([^\S\n]*\n rather than \s*\n, so a long run of
+# blank lines is not backtracked over once per newline)
+_TEST_METHOD_RE = re.compile(r'@Test(?:\s+|\s*\([^)]*\)[^\S\n]*\n\s*)public\s+void\s+(\w+)\s*\(')
+# Test method declaration; group 1 is the method name (also used by test_executor)
+_METHOD_DECL_RE = re.compile(r'public\s+void\s+(\w+)\s*\(')
+
+def _lines_containing(output: str, markers: Tuple[str, ...]) -> Iterator[str]:
+    """
+    Yield, in order, every line of the output that contains at least one of the markers.
+    
+    Result lines are usually a small part of a build log, so locating them with
+    str.find and matching only those lines is much cheaper than running a pattern
+    over the whole log.
+    
+    Args:
+        output: Raw output from test execution
+        markers: Literal substrings a wanted line must contain
+        
+    Returns:
+        Iterator over the matching lines (without their newline)
+    """
+    positions = [output.find(marker) for marker in markers]
+    while True:
+        found = [position for position in positions if position >= 0]
+        if not found:
+            return
+        hit = min(found)
+        line_end = output.find('\n', hit)
+        if line_end < 0:
+            line_end = len(output)
+        yield output[output.rfind('\n', 0, hit) + 1:line_end]
+        # Only markers that fell inside the yielded line need to be searched again
+        positions = [
+            position if position < 0 or position > line_end else output.find(marker, line_end)
+            for position, marker in zip(positions, markers)
+        ]
 
 def parse_gradle_test_output(output: str) -> Dict[str, bool]:
     """
@@ -11,61 +62,46 @@ def parse_gradle_test_output(output: str) -> Dict[str, bool]:
     Returns:
         Dictionary mapping test method names to pass/fail status
     """
+    # Fast path for a passing build: with no failure marker anywhere in the output
+    # every parsed result would be a pass, so skip the line scans entirely
+    if 'BUILD SUCCESSFUL' in output and 'FAILED' not in output and '✗' not in output:
+        summary_pattern = _GRADLE_SUMMARY_RE.search(output)
+        if summary_pattern is None or summary_pattern.group(2) == '0':
+            return {'all_tests': True}
+    
     results = {}
     
     # Look for the specific pattern we saw in the debug output:
     # "com.fishercoder.solutions._235Test > testNodesAreEqual FAILED"
-    test_result_pattern = re.compile(r'(\w+Test)\s*>\s*(\w+)\s+(PASSED|FAILED)')
-    
-    failed_tests = set()
-    for line_num, line in enumerate(output.split('\n'), 1):
-        match = test_result_pattern.search(line)
+    # Gradle typically also shows: ✓ testMethodName or ✗ testMethodName;
+    # both kinds of line are collected in the same pass over the output
+    check_marks = {}
+    for line in _lines_containing(output, ('PASSED', 'FAILED', '✓', '✗')):
+        match = _GRADLE_TEST_RE.search(line)
         if match:
+            # The status group is always PASSED or FAILED, so one comparison decides it
             test_class, method_name, status = match.groups()
-            if status == 'FAILED':
-                failed_tests.add(method_name)
-                results[method_name] = False
-            elif status == 'PASSED':
-                results[method_name] = True
-    
-    # Also look for the summary pattern: "X tests completed, Y failed"
-    summary_pattern = re.search(r'(\d+) tests? completed, (\d+) failed', output)
-    if summary_pattern:
-        total_tests = int(summary_pattern.group(1))
-        failed_tests_count = int(summary_pattern.group(2))
-        passed_tests_count = total_tests - failed_tests_count
+            results[method_name] = status == 'PASSED'
         
-        # If we have a summary but no individual results, and all tests passed,
-        # mark all tests as passed
-        if failed_tests_count == 0 and not results:
-            results['all_tests'] = True
-        # If we have some failed tests but not all individual results,
-        # this means the missing tests passed (Gradle only reports failures)
-        elif failed_tests_count > 0 and len(failed_tests) < failed_tests_count:
-            pass  # Some failed tests weren't captured in output
-    
-    # Look for test execution patterns
-    # Gradle typically shows: ✓ testMethodName or ✗ testMethodName
-    test_pattern = re.compile(r'([✓✗])\s+(\w+)')
-    
-    for line_num, line in enumerate(output.split('\n'), 1):
-        match = test_pattern.search(line)
+        match = _CHECK_MARK_RE.search(line)
         if match:
             status, method_name = match.groups()
-            results[method_name] = (status == '✓')
+            check_marks[method_name] = (status == '✓')
+    gradle_methods = set(results)
     
-    # Look for test class patterns (duplicate of first pattern, but keeping for compatibility)
-    test_class_pattern = re.compile(r'(\w+Test)\s*>\s*(\w+)\s+(PASSED|FAILED)')
+    # Also look for the summary pattern: "X tests completed, Y failed"
+    summary_pattern = _GRADLE_SUMMARY_RE.search(output)
+    # If we have a summary but no individual results, and all tests passed,
+    # mark all tests as passed (when some failed tests weren't captured in the
+    # output, the missing ones simply stay unreported)
+    if summary_pattern and int(summary_pattern.group(2)) == 0 and not results:
+        results['all_tests'] = True
     
-    for line_num, line in enumerate(output.split('\n'), 1):
-        match = test_class_pattern.search(line)
-        if match:
-            test_class, method_name, status = match.groups()
-            if status == 'FAILED':
-                failed_tests.add(method_name)
-                results[method_name] = False
-            elif status == 'PASSED':
-                results[method_name] = True
+    # Add the check-mark results; a "TestClassName > testMethodName" line
+    # takes precedence over a check mark for the same method
+    for method_name, passed in check_marks.items():
+        if method_name not in gradle_methods:
+            results[method_name] = passed
     
     # Look for build status
     if 'BUILD SUCCESS' in output or 'BUILD SUCCESSFUL' in output:
@@ -77,20 +113,6 @@ def parse_gradle_test_output(output: str) -> Dict[str, bool]:
         if not results:
             results['all_tests'] = False
     
-    # Look for additional Gradle patterns (duplicate, but keeping for compatibility)
-    # Sometimes Gradle shows: "TestClassName > testMethodName FAILED"
-    gradle_test_pattern = re.compile(r'(\w+Test)\s*>\s*(\w+)\s+(PASSED|FAILED)')
-    
-    for line_num, line in enumerate(output.split('\n'), 1):
-        match = gradle_test_pattern.search(line)
-        if match:
-            test_class, method_name, status = match.groups()
-            if status == 'FAILED':
-                failed_tests.add(method_name)
-                results[method_name] = False
-            elif status == 'PASSED':
-                results[method_name] = True
-    
     return results
 
 def parse_maven_test_output(output: str) -> Dict[str, bool]:
@@ -109,34 +131,40 @@ def parse_maven_test_output(output: str) -> Dict[str, bool]:
     # Tests run: 5, Failures: 0, Errors: 0, Skipped: 0
     # or individual test results in verbose mode
     
-    # Look for test execution summary
-    summary_pattern = re.compile(r'Tests run: (\d+), Failures: (\d+), Errors: (\d+)')
-    
-    for line in output.split('\n'):
-        match = summary_pattern.search(line)
+    # Look for the test execution summary (first one on each line; the last line printed wins)
+    # and for individual test results in verbose output (first "Running" on each line),
+    # both in the same pass over the output
+    all_tests_passed = None
+    running_tests = []
+    for line in _lines_containing(output, ('Tests run: ', 'Running ')):
+        match = _MAVEN_SUMMARY_RE.search(line)
         if match:
             total, failures, errors = map(int, match.groups())
             # If no failures and no errors, all tests passed
-            if failures == 0 and errors == 0:
-                # We can't determine individual test names from summary, so mark as success
-                results['all_tests'] = True
-            else:
-                results['all_tests'] = False
-    
-    # Look for individual test results in verbose output
-    test_pattern = re.compile(r'Running (\w+)')
-    for line in output.split('\n'):
-        match = test_pattern.search(line)
+            # (we can't determine individual test names from the summary)
+            all_tests_passed = failures == 0 and errors == 0
+        
+        match = _MAVEN_RUNNING_RE.search(line)
         if match:
-            test_name = match.group(1)
-            # Check if this test passed by looking for success indicators
-            if 'BUILD SUCCESS' in output:
-                results[test_name] = True
-            else:
-                results[test_name] = False
+            running_tests.append(match.group(1))
+    
+    if all_tests_passed is not None:
+        results['all_tests'] = all_tests_passed
+    
+    if running_tests:
+        # Check if the tests passed by looking for success indicators
+        build_success = 'BUILD SUCCESS' in output
+        for test_name in running_tests:
+            results[test_name] = build_success
     
     return results
 
+# Output parser for each supported build system
+_OUTPUT_PARSERS = {
+    "gradle": parse_gradle_test_output,
+    "maven": parse_maven_test_output,
+}
+
 def parse_test_output(output: str, build_system: str) -> Dict[str, bool]:
     """
     Parse test execution output based on the build system.
@@ -148,12 +176,76 @@ def parse_test_output(output: str, build_system: str) -> Dict[str, bool]:
     Returns:
         Dictionary mapping test method names to pass/fail status
     """
-    if build_system == "gradle":
-        return parse_gradle_test_output(output)
-    elif build_system == "maven":
-        return parse_maven_test_output(output)
-    else:
+    parser = _OUTPUT_PARSERS.get(build_system)
+    if parser is None:
         raise ValueError(f"Unsupported build system: {build_system}")
+    return parser(output)
+
+def _testcase_duration(testcase: ElementTree.Element) -> float:
+    """Run time in seconds of a <testcase> element (0.0 when the report gives none)."""
+    try:
+        return float(testcase.get('time', '0').replace(',', ''))
+    except ValueError:
+        return 0.0
+
+def parse_junit_xml_testcases(
+    report_file: Path,
+    durations: Optional[Dict[str, float]] = None
+) -> Optional[Dict[str, Tuple[str, str, str]]]:
+    """
+    Parse a JUnit XML report (as written by Gradle and Surefire) into per-method outcomes.
+    
+    Args:
+        report_file: Path to a TEST-*.xml report
+        durations: If given, filled with the run time of every test method in the same
+            pass; left untouched if the report cannot be read
+        
+    Returns:
+        Dictionary mapping test method names to (status, exception_type, details), where status
+        is "passed", "failure", "error" or "skipped" and exception_type/details are the type
+        attribute and stack trace of a failure/error element (empty otherwise),
+        or None if the report cannot be read
+    """
+    results = {}
+    report_durations = {}
+    try:
+        for _, element in ElementTree.iterparse(report_file, events=('end',)):
+            if element.tag != 'testcase':
+                continue
+            
+            # Gradle reports JUnit 5 methods as "name()"
+            method_name = element.get('name', '').split('(')[0]
+            outcome = ("passed", "", "")
+            for child in element:
+                if child.tag in ('failure', 'error', 'skipped'):
+                    outcome = (child.tag, child.get('type', ''), child.text or "")
+                    break
+            results[method_name] = outcome
+            if durations is not None:
+                report_durations[method_name] = _testcase_duration(element)
+            element.clear()
+    except (ElementTree.ParseError, OSError):
+        return None
+    
+    if durations is not None:
+        durations.update(report_durations)
+    return results
+
+def parse_junit_xml_report(report_file: Path) -> Optional[Dict[str, str]]:
+    """
+    Parse a JUnit XML report (as written by Gradle and Surefire) into per-method results.
+    
+    Args:
+        report_file: Path to a TEST-*.xml report
+        
+    Returns:
+        Dictionary mapping test method names to "passed", "failure", "error" or "skipped",
+        or None if the report cannot be read
+    """
+    testcases = parse_junit_xml_testcases(report_file)
+    if testcases is None:
+        return None
+    return {method_name: status for method_name, (status, _, _) in testcases.items()}
 
 def extract_test_method_names(test_content: str) -> List[str]:
     """
@@ -165,28 +257,12 @@ def extract_test_method_names(test_content: str) -> List[str]:
     Returns:
         List of test method names
     """
-    method_names = []
-    
-    # Look for @Test annotations followed by method declarations
-    # Handle both single-line and multi-line @Test annotations
-    # Pattern 1: @Test and method declaration on same line
-    test_pattern1 = re.compile(r'@Test\s+public\s+void\s+(\w+)\s*\(')
-    
-    # Pattern 2: @Test on separate line from method declaration
-    test_pattern2 = re.compile(r'@Test\s*\n\s*public\s+void\s+(\w+)\s*\(')
-    
-    # Pattern 3: @Test with expected exception on separate line
-    test_pattern3 = re.compile(r'@Test\s*\([^)]*\)\s*\n\s*public\s+void\s+(\w+)\s*\(')
-    
-    # Search with all patterns
-    for pattern in [test_pattern1, test_pattern2, test_pattern3]:
-        for match in pattern.finditer(test_content):
-            method_names.append(match.group(1))
-    
-    # Remove duplicates while preserving order
+    # Look for @Test annotations followed by method declarations (in source order),
+    # removing duplicates while preserving order
     seen = set()
     unique_method_names = []
-    for name in method_names:
+    for match in _TEST_METHOD_RE.finditer(test_content):
+        name = match.group(1)
         if name not in seen:
             seen.add(name)
             unique_method_names.append(name)
@@ -202,14 +278,14 @@ def extract_test_method_names_from_list(test_methods: List[str]) -> List[str]:
         test_methods: List of individual test method strings
         
     Returns:
-        List of unique test method names
+        List of unique test method names, in the order they first appear
     """
     method_names = []
     for test_method in test_methods:
-        method_name_match = re.search(r'public\s+void\s+(\w+)\s*\(', test_method)
+        method_name_match = _METHOD_DECL_RE.search(test_method)
         if method_name_match:
             method_names.append(method_name_match.group(1))
-    return list(set(method_names))  # Remove duplicates
+    return list(dict.fromkeys(method_names))  # Remove duplicates
 
 def get_fully_qualified_test_name(package: str, class_name: str, method_name: str) -> str:
     """